@@ -0,0 +1,34 @@
+"""Compare the json decoders of decoding.DECODERS on the sample data, with and without schema validation: python benchmarks/bench_decoding.py"""
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.append(str(Path(__file__).resolve().parents[1] / "tests"))
+from decoding import DECODERS
+from schemas import CryptoTicks, TruckParkList
+from test_sample_data import crypto_sample_data, autobahn_sample_data
+
+payloads = {
+    "crypto": (json.dumps(crypto_sample_data).encode(), CryptoTicks),
+    "autobahn": (json.dumps({"entries": autobahn_sample_data[0]}).encode(), TruckParkList),
+}
+
+
+def time_per_call(function) -> float:
+    """Best of several rounds in µs, which is the least disturbed by other load on the machine."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=7, number=number)) / number * 1e6
+
+
+print(f"{'payload':<10}{'decoder':<10}{'size':>10}{'decode':>12}{'validated':>12}{'overhead':>10}")
+for payload_name, (data, response_type) in payloads.items():
+    for decoder_name, decode in DECODERS.items():
+        plain = time_per_call(lambda: decode(data))
+        validated = time_per_call(lambda: decode(data, response_type))
+        print(
+            f"{payload_name:<10}{decoder_name:<10}{len(data):>9}B"
+            f"{plain:>9.1f} µs{validated:>9.1f} µs{(validated / plain - 1) * 100:>9.0f}%"
+        )
@@ -1,5 +1,6 @@
 import argparse
 from model import *
+from reports import REPORT_FORMATS
 
 keyToClass = {
     "crypto": CryptoVisualize,
@@ -7,10 +8,27 @@ keyToClass = {
     "autobahn": AutobahnVisualize,
 }
 
+modes = ["show", "daemon", "serve", "pipeline"]
+dtypeBackends = ["numpy", "pyarrow"]
+
 def getOptions():
     parser = argparse.ArgumentParser()
     arguments = [
-        ["-c", "--class", True, str],
+        ["-c", "--class", True, str, "+"],
+        ["-m", "--mode", False, str, None],
+        ["-o", "--output", False, str, None],
+        ["-i", "--interval", False, float, None],
+        ["-p", "--port", False, int, None],
+        ["-b", "--bundle", False, str, None],
+        ["-f", "--image-format", False, str, None],
+        ["-r", "--repeat", False, int, None],
+        ["-k", "--cache", False, str, None],
+        ["-d", "--dtype-backend", False, str, None],
+        ["-s", "--shards", False, int, None],
+        ["-y", "--history", False, str, None],
+        ["-e", "--report-format", False, str, None],
+        ["-l", "--report-file", False, str, None],
+        ["-j", "--run-report", False, str, None],
     ]
     for argument in arguments:
         parser.add_argument(
@@ -18,12 +36,38 @@ def getOptions():
             argument[1],
             required=argument[2],
             type=argument[3],
-            nargs=1
+            nargs=argument[4]
         )
     args = parser.parse_args()
     argsDict = vars(args)
-    selectedClassKey = argsDict["class"][0]
-    selectedClass = keyToClass[selectedClassKey]
-
-    return selectedClass
+    selectedClasses = [keyToClass[key] for key in argsDict["class"]]
+    mode = argsDict["mode"] or "show"
+    if mode not in modes:
+        parser.error(f"mode has to be one of {modes}")
+    # daemon and pipeline mode write to the output directory by default, the other modes only with -o
+    if argsDict["image_format"] is not None and argsDict["output"] is None and mode not in ["daemon", "pipeline"]:
+        parser.error("image format requires an output directory (-o)")
+    dtypeBackend = argsDict["dtype_backend"] or "numpy"
+    if dtypeBackend not in dtypeBackends:
+        parser.error(f"dtype backend has to be one of {dtypeBackends}")
+    reportFormat = argsDict["report_format"] or ("json" if argsDict["report_file"] else "text")
+    if reportFormat not in REPORT_FORMATS:
+        parser.error(f"report format has to be one of {REPORT_FORMATS}")
 
+    return {
+        "classes": selectedClasses,
+        "mode": mode,
+        "output": argsDict["output"],
+        "interval": argsDict["interval"],
+        "port": argsDict["port"] or 8000,
+        "bundle": argsDict["bundle"],
+        "image_format": argsDict["image_format"],
+        "repeat": argsDict["repeat"] or 1,
+        "cache": argsDict["cache"],
+        "dtype_backend": dtypeBackend,
+        "shards": argsDict["shards"],
+        "history": argsDict["history"],
+        "report_format": reportFormat,
+        "report_file": argsDict["report_file"],
+        "run_report": argsDict["run_report"],
+    }
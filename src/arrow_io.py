@@ -0,0 +1,67 @@
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Arrow-backed data frames require the pyarrow package (pip install pyarrow).")
+
+
+def arrow_types_mapper(arrow_type):
+    """Use pd.ArrowDtype for all columns, except dictionary encoded ones, which stay pandas categoricals."""
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def records_to_frame(records: list[dict], columns: dict[str, str], types: dict[str, str] | None = None) -> pd.DataFrame:
+    """
+    Parse json records straight into an Arrow table and wrap it as data frame, renaming {record key: column}.
+    Keys missing in the first record become null columns. types casts columns to Arrow types given by their alias,
+    e.g. {"price": "double"}, since Arrow infers int64 for numbers that happen to be integral.
+    """
+    require_pyarrow()
+    table = pa.Table.from_pylist(records)
+    for key in columns.keys() - set(table.column_names):
+        table = table.append_column(key, pa.nulls(len(table)))
+    table = (
+        table
+        .select(list(columns.keys()))
+        .rename_columns(list(columns.values()))
+    )
+    for column, alias in (types or {}).items():
+        position = table.column_names.index(column)
+        table = table.set_column(position, column, table.column(column).cast(pa.type_for_alias(alias)))
+    return table.to_pandas(types_mapper=arrow_types_mapper)
+
+
+def to_arrow_backed(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert all non-categorical columns of df to Arrow-backed dtypes."""
+    require_pyarrow()
+    return df.convert_dtypes(dtype_backend="pyarrow")
+
+
+def write_ipc(df: pd.DataFrame, path: str) -> None:
+    """Persist df as uncompressed Arrow IPC (Feather v2) file, which other processes can memory-map."""
+    require_pyarrow()
+    tmp_path = path + ".tmp"
+    feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def read_ipc(path: str, arrow_backed: bool = True) -> pd.DataFrame:
+    """
+    Memory-map an Arrow IPC file written by write_ipc; Arrow-backed columns reference the mapped file without copying it.
+    With arrow_backed=False, the columns are converted to the usual NumPy dtypes instead.
+    """
+    require_pyarrow()
+    table = feather.read_table(path, memory_map=True)
+    if not arrow_backed:
+        return table.to_pandas()
+    return table.to_pandas(types_mapper=arrow_types_mapper)
@@ -0,0 +1,39 @@
+import sched
+import time
+from model import ApiVisualize
+from http_client import ApiRequestError
+
+
+def run_daemon(visualization_classes: list[type[ApiVisualize]], output_dir: str, interval: float | None = None) -> None:
+    """
+    Keep one object per visualization class alive and refresh its output every refresh_interval seconds.
+    Connections and caches of the shared http client stay warm between the runs.
+    """
+    scheduler = sched.scheduler(time.monotonic, time.sleep)
+    for visualization_class in visualization_classes:
+        visualization_object = visualization_class()
+        visualization_object.output_dir = output_dir
+        if interval is not None:
+            visualization_object.refresh_interval = interval
+        scheduler.enterabs(time.monotonic(), 1, refresh, (scheduler, visualization_object))
+    scheduler.run()
+
+
+def refresh(scheduler: sched.scheduler, visualization_object: ApiVisualize) -> None:
+    """
+    Run the template method once and schedule the next run, keeping a fixed refresh rate.
+    A failing run is logged and does not stop the daemon, the next run tries again.
+    """
+    started = time.monotonic()
+    try:
+        visualization_object.show_me_stuff()
+    except ApiRequestError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error: {type(visualization_object).__name__} failed: {e!r}")
+    if visualization_object.render_pool is not None:
+        for rendering in visualization_object.render_pool.collect_done():
+            if rendering.exception() is not None:
+                print(f"Error: rendering failed: {rendering.exception()}")
+    next_run = max(started + visualization_object.refresh_interval, time.monotonic())
+    scheduler.enterabs(next_run, 1, refresh, (scheduler, visualization_object))
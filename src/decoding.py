@@ -0,0 +1,151 @@
+import json
+from functools import cache
+from typing import Any, Callable, get_args, get_origin, get_type_hints, is_typeddict
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class DecodeError(ValueError):
+    """Raised when content is no valid json, whichever decoder is used."""
+
+
+class ValidationError(DecodeError):
+    """Raised when decoded content does not match its schema, naming the path of the wrong value."""
+
+
+def type_name(value) -> str:
+    return {dict: "object", list: "array", type(None): "null"}.get(type(value), type(value).__name__)
+
+
+def index_of(values: list, item) -> int:
+    """Position of item in values, looked up only to report an invalid item."""
+    return next(number for number, value in enumerate(values) if value is item)
+
+
+@cache
+def compile_validator(schema) -> Callable[[object, str], None]:
+    """
+    Generate and compile the source of a validator function validator(value, path) for a schema (see schemas),
+    which raises ValidationError like "Expected `str`, got `int` - at `$[0].coordinate.lat`".
+    Valid content is checked without function calls; the path of an invalid value, including the positions of
+    array items, is only looked up when raising.
+    Like msgspec, object fields that are not part of the schema are dropped from the content.
+    """
+    # json numbers without fraction are valid floats, but booleans are no numbers
+    constants = {"ValidationError": ValidationError, "type_name": type_name, "index_of": index_of, "number_types": frozenset({float, int})}
+    # valid values of optional scalar fields, so that a missing field can be checked like a present one
+    valid_defaults = {str: "", int: 0, float: 0.0, bool: False}
+    lines = ["def validator(v0, path):"]
+
+    def fail(message: str, location: str, indent: str):
+        lines.append(f"{indent}    raise ValidationError(f\"{message} - at `{{path}}{location}`\")")
+
+    def generate(schema, name: str, location: str, indent: str):
+        """Append the checks of name, whose path is path + location (an f-string fragment)."""
+        if schema is None or schema is Any:
+            return
+        if schema in (str, int, bool):
+            lines.append(f"{indent}if type({name}) is not {schema.__name__}:")
+            fail(f"Expected `{schema.__name__}`, got `{{type_name({name})}}`", location, indent)
+        elif schema is float:
+            lines.append(f"{indent}if type({name}) not in number_types:")
+            fail(f"Expected `float`, got `{{type_name({name})}}`", location, indent)
+        elif get_origin(schema) is list:
+            item = f"v{len(lines)}"
+            lines.append(f"{indent}if type({name}) is not list:")
+            fail(f"Expected `array`, got `{{type_name({name})}}`", location, indent)
+            lines.append(f"{indent}for {item} in {name}:")
+            length = len(lines)
+            generate(get_args(schema)[0], item, f"{location}[{{index_of({name}, {item})}}]", indent + "    ")
+            if len(lines) == length:
+                lines.append(f"{indent}    pass")
+        elif is_typeddict(schema):
+            required = f"required{len(constants)}"
+            constants[required] = schema.__required_keys__
+            known = f"known{len(constants)}"
+            constants[known] = frozenset(get_type_hints(schema))
+            lines.append(f"{indent}if type({name}) is not dict:")
+            fail(f"Expected `object`, got `{{type_name({name})}}`", location, indent)
+            # objects with exactly the fields of the schema need no further key checks
+            lines.append(f"{indent}if {name}.keys() != {known}:")
+            lines.append(f"{indent}    if not {required} <= {name}.keys():")
+            fail(f"Object missing required field `{{sorted({required} - {name}.keys())[0]}}`", location, indent + "    ")
+            lines.append(f"{indent}    if not {name}.keys() <= {known}:")
+            lines.append(f"{indent}        for unknown in {name}.keys() - {known}: del {name}[unknown]")
+            for key, field_type in get_type_hints(schema).items():
+                field = f"v{len(lines)}"
+                field_location = location + "." + key.replace("{", "{{").replace("}", "}}")
+                if key in schema.__required_keys__:
+                    lines.append(f"{indent}{field} = {name}[{key!r}]")
+                    generate(field_type, field, field_location, indent)
+                elif field_type in valid_defaults:
+                    lines.append(f"{indent}{field} = {name}.get({key!r}, {valid_defaults[field_type]!r})")
+                    generate(field_type, field, field_location, indent)
+                else:
+                    lines.append(f"{indent}if {key!r} in {name}:")
+                    lines.append(f"{indent}    {field} = {name}[{key!r}]")
+                    generate(field_type, field, field_location, indent + "    ")
+        else:
+            raise TypeError(f"Unsupported schema type {schema!r}")
+
+    generate(schema, "v0", "", "    ")
+    lines.append("    return")
+    namespace = dict(constants)
+    exec("\n".join(lines), namespace)
+    return namespace["validator"]
+
+
+def decode_stdlib(data: bytes, response_type=None):
+    try:
+        content = json.loads(data)
+    except json.JSONDecodeError as e:
+        raise DecodeError(str(e)) from e
+    compile_validator(response_type)(content, "$")
+    return content
+
+
+def decode_orjson(data: bytes, response_type=None):
+    try:
+        content = orjson.loads(data)
+    except orjson.JSONDecodeError as e:
+        raise DecodeError(str(e)) from e
+    compile_validator(response_type)(content, "$")
+    return content
+
+
+def decode_msgspec(data: bytes, response_type=None):
+    """Decode and validate against response_type (see schemas) in one pass."""
+    try:
+        return msgspec.json.decode(data, type=response_type or Any)
+    except msgspec.ValidationError as e:
+        raise ValidationError(str(e)) from e
+    except msgspec.DecodeError as e:
+        raise DecodeError(str(e)) from e
+
+
+# available json decoders, fastest first.
+# Only msgspec validates while decoding, at no measurable cost. orjson and json validate the decoded objects in a second
+# pass of generated code, which costs about 70-120% of the orjson decode time and 35-50% of the json decode time
+# on the sample payloads (see benchmarks/bench_decoding.py).
+DECODERS: dict[str, Callable] = {
+    name: decoder
+    for name, decoder, available in [
+        ("msgspec", decode_msgspec, msgspec is not None),
+        ("orjson", decode_orjson, orjson is not None),
+        ("json", decode_stdlib, True),
+    ]
+    if available
+}
+
+
+def default_decoder() -> str:
+    """Name of the fastest installed decoder."""
+    return next(iter(DECODERS))
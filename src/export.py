@@ -0,0 +1,141 @@
+import base64
+import json
+import os
+import numpy as np
+from plotly.offline import get_plotlyjs
+from plotly.utils import PlotlyJSONEncoder
+from output import atomic_write
+
+PLOTLYJS_FILENAME = "plotly.min.js"
+
+# numpy dtypes that plotly.js can decode from base64 typed arrays
+TYPED_ARRAY_DTYPES = {
+    "int8": "i1",
+    "uint8": "u1",
+    "int16": "i2",
+    "uint16": "u2",
+    "int32": "i4",
+    "uint32": "u4",
+    "float32": "f4",
+    "float64": "f8",
+}
+
+# trace attributes holding data arrays (dotted for nested ones); other numeric lists like domain.x are no data
+DATA_ARRAY_ATTRIBUTES = {
+    "x", "y", "z", "lat", "lon", "r", "theta", "a", "b", "c", "u", "v", "w",
+    "open", "high", "low", "close", "values", "parents", "customdata",
+    "marker.size", "marker.color", "marker.opacity", "line.width", "line.color",
+    "error_x.array", "error_x.arrayminus", "error_y.array", "error_y.arrayminus",
+}
+
+# plotly.js bundles already checked to be up to date in this process
+_current_plotlyjs: set[str] = set()
+
+
+def write_plotlyjs(output_dir: str) -> str:
+    """
+    Write the plotly.js bundle to output_dir, so all exported figures can share it.
+    An existing bundle is replaced if it differs, e.g. after upgrading plotly; this is checked once per process.
+    """
+    path = os.path.join(output_dir, PLOTLYJS_FILENAME)
+    if path in _current_plotlyjs:
+        return path
+    bundle = get_plotlyjs().encode()
+    if not os.path.exists(path) or os.path.getsize(path) != len(bundle) or read_file(path) != bundle:
+        atomic_write(path, bundle)
+    _current_plotlyjs.add(path)
+    return path
+
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def encode_typed_array(values: np.ndarray) -> dict | np.ndarray:
+    """
+    Encode a numeric array as base64 typed array, e.g. {"dtype": "f8", "bdata": "..."}.
+    Multi-dimensional arrays (e.g. heatmap z) are encoded as one typed array with their shape.
+    """
+    if values.dtype.kind in "iu" and values.dtype.itemsize == 8:
+        # plotly.js has no 64 bit integer arrays
+        if len(values) and (values.min() < np.iinfo(np.int32).min or values.max() > np.iinfo(np.int32).max):
+            values = values.astype(np.float64)
+        else:
+            values = values.astype(np.int32)
+    if values.dtype.name not in TYPED_ARRAY_DTYPES:
+        return values
+    values = np.ascontiguousarray(values.astype(values.dtype.newbyteorder("<"), copy=False))
+    encoded = {
+        "dtype": TYPED_ARRAY_DTYPES[values.dtype.name],
+        "bdata": base64.b64encode(values.tobytes()).decode(),
+    }
+    if values.ndim > 1:
+        encoded["shape"] = ",".join(str(length) for length in values.shape)
+    return encoded
+
+
+def encode_data_array(value):
+    """Encode a numeric 1-d or 2-d data array, leave any other value (strings, ragged lists, ...) unchanged."""
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return value
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            # ragged nested lists
+            return value
+    elif isinstance(value, np.ndarray):
+        array = value
+    else:
+        return value
+    if array.ndim not in (1, 2) or array.dtype.kind not in "iuf":
+        return value
+    return encode_typed_array(array)
+
+
+def encode_arrays(trace: dict, prefix: str = "") -> dict:
+    """Replace the numeric data arrays of a trace (see DATA_ARRAY_ATTRIBUTES) by base64 typed arrays."""
+    encoded = {}
+    for key, value in trace.items():
+        path = prefix + key
+        if isinstance(value, dict):
+            encoded[key] = encode_arrays(value, path + ".")
+        elif path in DATA_ARRAY_ATTRIBUTES:
+            encoded[key] = encode_data_array(value)
+        else:
+            encoded[key] = value
+    return encoded
+
+
+def compact_figure_json(fig) -> str:
+    """
+    Figure as json, with numeric data arrays encoded as base64 typed arrays instead of decimal text.
+    "</" is escaped like plotly does, so that strings from the api cannot close the inline script they are embedded in.
+    """
+    figure = fig.to_plotly_json()
+    figure["data"] = [encode_arrays(trace) for trace in figure["data"]]
+    return json.dumps(figure, cls=PlotlyJSONEncoder, separators=(",", ":")).replace("</", "<\\/")
+
+
+def figures_to_html(figures: list, plotlyjs_src: str = PLOTLYJS_FILENAME) -> str:
+    """One html page showing all figures, loading plotly.js from plotlyjs_src instead of embedding it."""
+    divs = []
+    scripts = []
+    for number, fig in enumerate(figures):
+        divs.append(f'<div id="figure-{number}" style="height:100vh"></div>')
+        scripts.append(f'Plotly.newPlot("figure-{number}", {compact_figure_json(fig)});')
+    return (
+        "<html>\n<head><meta charset=\"utf-8\" />"
+        f"<script src=\"{plotlyjs_src}\"></script></head>\n<body>\n"
+        + "\n".join(divs)
+        + "\n<script>\n"
+        + "\n".join(scripts)
+        + "\n</script>\n</body>\n</html>\n"
+    )
+
+
+def write_bundle(figures: list, path: str) -> None:
+    """Write several figures into one html page next to a shared plotly.js bundle."""
+    write_plotlyjs(os.path.dirname(os.path.abspath(path)))
+    atomic_write(path, figures_to_html(figures).encode())
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from output import atomic_write
+
+HEADER_FILENAME = "header.json"
+FORMAT_VERSION = 1
+
+
+def to_datetime64(value) -> np.datetime64:
+    """Timestamp (string, datetime or datetime64) as naive UTC datetime64[ns]."""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None)
+    return timestamp.to_datetime64().astype("datetime64[ns]")
+
+
+class CryptoHistory:
+    """
+    Persistent history of processed crypto ticks in a directory:
+        - header.json: format version, column dtypes, number of stored rows (length) and allocated rows (capacity)
+        - <column>.npy: one fixed-width column per file, memory-mapped, sorted by time
+    Appending writes only the new rows and the header, which is replaced last, so readers never see partly written rows.
+    The files are preallocated and grow by doubling, which keeps appending O(1) amortized.
+    Time ranges are found by binary search on the mapped time column and returned as views, reading only their pages.
+    Appending holds lock, which readers in other threads (see queries.TickQuery) hold for a consistent state.
+    """
+
+    COLUMNS: dict[str, str] = {
+        "time": "<M8[ns]",
+        "price": "<f8",
+        "volume_24h": "<f8",
+        "market_cap": "<f8",
+    }
+
+    def __init__(self, directory: str, initial_capacity: int = 1024):
+        self.directory = directory
+        self.initial_capacity = initial_capacity
+        self.columns: dict[str, np.memmap] = {}
+        self.lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self.reload()
+
+    def reload(self) -> None:
+        """Read the header again, e.g. to see rows appended by another process."""
+        with self.lock:
+            self.read_header()
+
+    def read_header(self) -> None:
+        header_path = os.path.join(self.directory, HEADER_FILENAME)
+        if os.path.exists(header_path):
+            with open(header_path) as file:
+                header = json.load(file)
+            if header["version"] != FORMAT_VERSION or header["columns"] != self.COLUMNS:
+                raise ValueError(f"{self.directory} holds an incompatible history (version {header['version']})")
+        else:
+            header = {"length": 0, "capacity": 0}
+        self.length: int = header["length"]
+        self.capacity: int = header["capacity"]
+        self.columns = {
+            column: np.load(self.column_path(column), mmap_mode="r+")
+            for column in self.COLUMNS
+        } if self.capacity else {}
+
+    def column_path(self, column: str) -> str:
+        return os.path.join(self.directory, f"{column}.npy")
+
+    def write_header(self) -> None:
+        header = {"version": FORMAT_VERSION, "columns": self.COLUMNS, "length": self.length, "capacity": self.capacity}
+        atomic_write(os.path.join(self.directory, HEADER_FILENAME), json.dumps(header).encode())
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def times(self) -> np.ndarray:
+        """Sorted time column of the stored rows (a view of the mapped file)."""
+        if not self.length:
+            return np.empty(0, dtype=self.COLUMNS["time"])
+        return self.columns["time"][:self.length]
+
+    def grow(self, capacity: int) -> None:
+        """Reallocate all column files for capacity rows, keeping the stored ones."""
+        for column, dtype in self.COLUMNS.items():
+            tmp_path = self.column_path(column) + ".tmp"
+            grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.dtype(dtype), shape=(capacity,))
+            if self.length:
+                grown[:self.length] = self.columns[column][:self.length]
+            grown.flush()
+            del grown
+            os.replace(tmp_path, self.column_path(column))
+        self.capacity = capacity
+        self.write_header()
+        self.columns = {column: np.load(self.column_path(column), mmap_mode="r+") for column in self.COLUMNS}
+
+    def append(self, data: pd.DataFrame) -> int:
+        """
+        Append the rows of a processed data frame, which are newer than the last stored row.
+        Overlapping api responses can thus be appended again and again. Returns the number of appended rows.
+        """
+        with self.lock:
+            return self.append_rows(data)
+
+    def append_rows(self, data: pd.DataFrame) -> int:
+        times = pd.to_datetime(data["time"], utc=True).dt.tz_convert(None).to_numpy("datetime64[ns]")
+        order = np.argsort(times, kind="stable")
+        if self.length:
+            order = order[times[order] > self.times[-1]]
+        if not len(order):
+            return 0
+        # keep the first of several rows with the same time
+        order = order[np.concatenate(([True], np.diff(times[order]) > np.timedelta64(0)))]
+        new_length = self.length + len(order)
+        if new_length > self.capacity:
+            capacity = max(self.capacity, self.initial_capacity)
+            while capacity < new_length:
+                capacity *= 2
+            self.grow(capacity)
+        for column in self.COLUMNS:
+            if column == "time":
+                values = times[order]
+            elif column in data:
+                values = data[column].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+            else:
+                values = np.nan
+            self.columns[column][self.length:new_length] = values
+            self.columns[column].flush()
+        self.length = new_length
+        self.write_header()
+        return len(order)
+
+    def slice(self, start=None, end=None) -> slice:
+        """Positions of the rows with start <= time < end, found by binary search."""
+        times = self.times
+        first = 0 if start is None else int(np.searchsorted(times, to_datetime64(start), side="left"))
+        last = self.length if end is None else int(np.searchsorted(times, to_datetime64(end), side="left"))
+        return slice(first, max(first, last))
+
+    def range(self, start=None, end=None) -> pd.DataFrame:
+        """Rows with start <= time < end as data frame, whose columns are views of the mapped files."""
+        rows = self.slice(start, end)
+        if not self.length:
+            return pd.DataFrame({column: np.empty(0, dtype=dtype) for column, dtype in self.COLUMNS.items()})
+        return pd.DataFrame({column: self.columns[column][rows] for column in self.COLUMNS}, copy=False)
@@ -0,0 +1,301 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Hashable
+from urllib.parse import urlparse
+import requests as rq
+from decoding import DECODERS, DecodeError, default_decoder
+
+
+class ApiRequestError(Exception):
+    """Raised when an upstream API answers with an unexpected status code."""
+
+
+class PayloadValidationError(ApiRequestError):
+    """Raised when an upstream API answers with content that is no valid json or does not match its schema."""
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls with the same key: the first caller does the work, all others wait for its result."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, function: Callable):
+        with self.lock:
+            future = self.calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self.calls[key] = Future()
+        if not is_leader:
+            return future.result()
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts of up to `capacity` requests.
+    The rate adapts to the upstream: it is halved on every 429 response and slowly recovers on successful ones.
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated = clock()
+        self.blocked_until = float("-inf")
+        self.lock = threading.Lock()
+        # metrics
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller has to wait before using it."""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = max(self.blocked_until - now, -self.tokens / self.rate, 0.0)
+            self.requests += 1
+            self.wait_seconds += delay
+            return delay
+
+    def acquire(self) -> None:
+        time.sleep(self.reserve())
+
+    async def acquire_async(self) -> None:
+        await asyncio.sleep(self.reserve())
+
+    def penalize(self, retry_after: float) -> None:
+        """Handle a 429 response: block the host for retry_after seconds and halve the rate."""
+        with self.lock:
+            self.throttled += 1
+            self.blocked_until = max(self.blocked_until, self.clock() + retry_after)
+            self.rate = max(self.rate / 2, self.max_rate / 32)
+
+    def reward(self) -> None:
+        """Handle a successful response: recover the rate additively."""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class RateLimiter:
+    """Client-side rate limiting with one token bucket per upstream host, shared by all threads and async tasks."""
+
+    def __init__(self, limits: dict[str, tuple[float, int]], default_limit: tuple[float, int] = (10, 10)):
+        self.limits = limits
+        self.default_limit = default_limit
+        self.buckets: dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).hostname
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(*self.limits.get(host, self.default_limit))
+            return self.buckets[host]
+
+    def metrics(self) -> dict[str, dict]:
+        """Requests, 429 responses, total waiting time and current rate per host."""
+        return {
+            host: {
+                "requests": bucket.requests,
+                "throttled": bucket.throttled,
+                "wait_seconds": bucket.wait_seconds,
+                "rate": bucket.rate,
+            }
+            for host, bucket in self.buckets.items()
+        }
+
+
+def parse_retry_after(value: str | None, default: float = 1.0, maximum: float = 60.0) -> float:
+    """
+    Seconds to wait according to a Retry-After header, given in seconds or as http date.
+    The wait is capped at maximum, so a bogus header cannot block a host for a long time.
+    """
+    if value is None:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return default
+    if seconds != seconds:
+        # NaN
+        return default
+    return min(max(seconds, 0.0), maximum)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """Cached response content, with its validators for conditional requests, the time it was fetched and its size in bytes."""
+    validators: dict
+    content: object
+    fetched_at: float
+    size: int = 0
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for all ApiVisualize subclasses:
+        - one requests.Session, so connections stay warm between runs
+        - a response cache, revalidated with ETag / Last-Modified (conditional requests)
+        - single-flight requests, so concurrent requests for the same url share one upstream request
+        - client-side rate limiting per host, which backs off on 429 responses
+        - stale-while-revalidate: cached content within a stale window is returned at once and refreshed in the background
+        - a pluggable json decoder (msgspec, orjson or stdlib json, see decoding.DECODERS)
+    """
+    # requests per second and burst size per upstream host
+    rate_limits: dict[str, tuple[float, int]] = {
+        "api.coinpaprika.com": (10, 10),
+        "api.deutschland-api.dev": (5, 5),
+        "dog.ceo": (10, 10),
+        "images.dog.ceo": (20, 20),
+    }
+    max_retries: int = 3
+    # longest wait accepted from a Retry-After header
+    max_retry_after: float = 60.0
+    # seconds to wait for the connection and for response data, so that a stalled connection raises instead of hanging
+    timeout: tuple[float, float] = (5.0, 30.0)
+    # least recently used responses are dropped from the cache above this size
+    max_cache_entries: int = 256
+
+    def __init__(self):
+        self.session = rq.Session()
+        self.rate_limiter = RateLimiter(self.rate_limits)
+        self.cache: OrderedDict[tuple[str, str], CacheEntry] = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.in_flight = SingleFlight()
+        self.revalidating: set[tuple[str, str]] = set()
+        self.decoder: str = default_decoder()
+        # bytes of response content returned to the current thread, see payload_bytes
+        self.payload = threading.local()
+
+    def get(self, url: str, validators: dict | None = None) -> rq.Response:
+        """Send a GET request for url, made conditional by the validators of a cached response."""
+        headers = {}
+        if validators:
+            if "ETag" in validators:
+                headers["If-None-Match"] = validators["ETag"]
+            if "Last-Modified" in validators:
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+        bucket = self.rate_limiter.bucket(url)
+        for _ in range(self.max_retries + 1):
+            bucket.acquire()
+            try:
+                res = self.session.get(url, headers=headers, timeout=self.timeout)
+            except rq.RequestException as e:
+                # connection errors and timeouts are api errors as well, callers only have to handle one type
+                raise ApiRequestError(f"Requesting {url} failed: {e}") from e
+            if res.status_code != 429:
+                bucket.reward()
+                break
+            bucket.penalize(parse_retry_after(res.headers.get("Retry-After"), maximum=self.max_retry_after))
+        if res.status_code not in (200, 304) or (res.status_code == 304 and not validators):
+            raise ApiRequestError(f"Something didnt work when requesting at {url}.")
+        return res
+
+    def get_json(self, url: str, max_age: float = 0, stale_while_revalidate: float = 0, response_type=None):
+        """
+        Request url and return the decoded json content.
+        Cached content younger than max_age is returned without a request. Content up to stale_while_revalidate
+        seconds older is returned as well, while a background request refreshes it.
+        response_type is the expected schema of the content (see schemas), used by decoders supporting it.
+        """
+        decoder = DECODERS[self.decoder]
+        def decode(res):
+            try:
+                return decoder(res.content, response_type)
+            except DecodeError as e:
+                raise PayloadValidationError(f"Invalid response from {url}: {e}") from e
+        return self._get_cached(("json", url), decode, max_age, stale_while_revalidate)
+
+    def get_bytes(self, url: str, max_age: float = 0, stale_while_revalidate: float = 0) -> bytes:
+        """Request url and return the raw response body, see get_json for the cache parameters."""
+        return self._get_cached(("bytes", url), lambda res: res.content, max_age, stale_while_revalidate)
+
+    def payload_bytes(self) -> int:
+        """Total size of the (raw) response content returned to the calling thread, including cached content."""
+        return getattr(self.payload, "bytes", 0)
+
+    def _count_payload(self, entry: CacheEntry | None) -> None:
+        if entry is not None:
+            self.payload.bytes = self.payload_bytes() + entry.size
+
+    def _get_cached(self, key: tuple[str, str], decode, max_age: float, stale_while_revalidate: float):
+        with self.cache_lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                # every use counts as recent, so that frequently requested urls are not evicted
+                self.cache.move_to_end(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < max_age:
+                self._count_payload(entry)
+                return entry.content
+            if age < max_age + stale_while_revalidate:
+                self._revalidate_in_background(key, decode)
+                self._count_payload(entry)
+                return entry.content
+        content = self.in_flight.do(key, lambda: self._fetch(key, decode))
+        self._count_payload(self.cache.get(key))
+        return content
+
+    def _revalidate_in_background(self, key: tuple[str, str], decode) -> None:
+        with self.cache_lock:
+            if key in self.revalidating:
+                return
+            self.revalidating.add(key)
+
+        def revalidate():
+            try:
+                self.in_flight.do(key, lambda: self._fetch(key, decode))
+            except (ApiRequestError, rq.RequestException):
+                # keep the stale content, the next request tries again
+                pass
+            finally:
+                with self.cache_lock:
+                    self.revalidating.discard(key)
+
+        threading.Thread(target=revalidate, daemon=True).start()
+
+    def _fetch(self, key: tuple[str, str], decode):
+        """Request the url of key and swap the new content into the cache."""
+        entry = self.cache.get(key)
+        res = self.get(key[1], entry.validators if entry is not None else None)
+        if res.status_code == 304:
+            content, size = entry.content, entry.size
+        else:
+            content, size = decode(res), len(res.content)
+        validators = {
+            name: res.headers[name]
+            for name in ("ETag", "Last-Modified")
+            if name in res.headers
+        }
+        with self.cache_lock:
+            self.cache[key] = CacheEntry(validators, content, time.monotonic(), size)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_cache_entries:
+                self.cache.popitem(last=False)
+        return content
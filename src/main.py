@@ -1,11 +1,98 @@
+import os
 from model import *
 from args import getOptions
+from daemon import run_daemon
+from server import run_server
+from export import write_bundle
+from rendering import RenderPool
+from pipeline import Pipeline
+from memo import ProcessCache
+from sharding import ShardPool
+from history import CryptoHistory
+from queries import TickQuery
+from reports import AsyncSink, FileSink, StreamSink
 
-# Get command-line option
-selectedClass = getOptions()
+# Get command-line options
+options = getOptions()
 
-# Create specified object
-sampleObject: ApiVisualize = selectedClass()
+# Export static images in a pool of worker processes
+if options["image_format"] is not None:
+    ApiVisualize.render_pool = RenderPool(image_format=options["image_format"])
+
+# Use Arrow-backed data frames
+ApiVisualize.arrow_backed = options["dtype_backend"] == "pyarrow"
+
+# Skip processing of raw content that was already processed
+if options["cache"] is not None:
+    ApiVisualize.process_cache = ProcessCache(directory=options["cache"])
+
+# Process the highways in shards across worker processes
+if options["shards"] is not None:
+    AutobahnVisualize.shard_pool = ShardPool(workers=options["shards"])
+
+# Keep the crypto ticks in a persistent history
+if options["history"] is not None:
+    CryptoVisualize.history = CryptoHistory(options["history"])
+
+# Write every report at once, in a background thread for the long-running modes
+if options["report_file"] is not None:
+    ApiVisualize.report_sink = FileSink(options["report_file"], options["report_format"])
+else:
+    ApiVisualize.report_sink = StreamSink(report_format=options["report_format"])
+if options["mode"] in ["daemon", "pipeline"]:
+    ApiVisualize.report_sink = AsyncSink(ApiVisualize.report_sink)
+
+# Append metrics and stage timings of every run as json lines
+if options["run_report"] is not None:
+    ApiVisualize.run_report_sink = FileSink(options["run_report"], "json")
+    if options["mode"] in ["daemon", "pipeline"]:
+        ApiVisualize.run_report_sink = AsyncSink(ApiVisualize.run_report_sink)
+
+if options["mode"] == "daemon":
+    # Refresh the visualizations periodically, writing them to the output directory
+    run_daemon(options["classes"], options["output"] or "output", options["interval"])
+elif options["mode"] == "serve":
+    # Serve the rendered visualizations over http
+    run_server(options["classes"], options["port"], TickQuery(CryptoVisualize.history) if CryptoVisualize.history is not None else None)
+elif options["mode"] == "pipeline":
+    # Run all jobs as staged pipeline, writing them to the output directory
+    jobs = []
+    for selectedClass in options["classes"]:
+        for number in range(options["repeat"]):
+            sampleObject: ApiVisualize = selectedClass()
+            sampleObject.output_dir = os.path.join(options["output"] or "output", str(number))
+            jobs.append(sampleObject)
+    for sampleObject, error in Pipeline(shared_memory=True).run(jobs):
+        if error is not None:
+            print(f"Error: {error}")
+else:
+    figures = []
+    for selectedClass in options["classes"]:
+        # Create specified object
+        sampleObject: ApiVisualize = selectedClass()
+        sampleObject.output_dir = options["output"]
+        sampleObject.headless = options["bundle"] is not None
+
+        # Peform template method
+        try:
+            sampleObject.show_me_stuff()
+        except ApiRequestError as e:
+            print(f"Error: {e}")
+            exit()
+        if sampleObject.figure is not None:
+            figures.append(sampleObject.figure)
+
+    # Write all figures into one page
+    if options["bundle"] is not None:
+        write_bundle(figures, options["bundle"])
+
+# Wait for the static images
+if ApiVisualize.render_pool is not None:
+    ApiVisualize.render_pool.wait()
+    ApiVisualize.render_pool.shutdown()
+if AutobahnVisualize.shard_pool is not None:
+    AutobahnVisualize.shard_pool.shutdown()
+ApiVisualize.report_sink.close()
+if ApiVisualize.run_report_sink is not None:
+    ApiVisualize.run_report_sink.close()
 
-# Peform template method
-sampleObject.show_me_stuff()
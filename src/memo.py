@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+import pandas as pd
+from output import atomic_write
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def content_digest(content) -> str:
+    """Hash of raw api content (json or bytes), used to detect whether it changed."""
+    if not isinstance(content, bytes):
+        content = json.dumps(content, sort_keys=True).encode()
+    return hashlib.sha256(content).hexdigest()
+
+
+class ProcessCache:
+    """
+    LRU cache for the results of process_content, keyed by the hash of the raw api content.
+    With a directory, results are also persisted: data frames as parquet (requires pyarrow), images as raw bytes.
+    Pickling a cache only carries its configuration, so that worker processes get their own cache in the same directory
+    and share the results through it.
+    """
+
+    def __init__(self, max_entries: int = 32, directory: str | None = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.lock = threading.Lock()
+        # key -> processed data, or None if it is only stored on disk
+        self.entries: OrderedDict[str, object] = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            files = sorted(
+                (entry for entry in os.scandir(directory) if entry.name.endswith((".parquet", ".bin"))),
+                key=lambda entry: entry.stat().st_mtime,
+            )
+            for entry in files:
+                self.entries[os.path.splitext(entry.name)[0]] = None
+
+    def __reduce__(self):
+        return type(self), (self.max_entries, self.directory)
+
+    def get_or_compute(self, namespace: str, content, compute: Callable):
+        """Return the processed data for content, calling compute(content) only if it is not cached yet."""
+        key = f"{namespace}-{content_digest(content)}"
+        with self.lock:
+            if key not in self.entries and self.is_stored(key):
+                # stored by another process sharing the directory
+                self.entries[key] = None
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                data = self.entries[key]
+                if data is None:
+                    try:
+                        data = self.entries[key] = self.load(key)
+                    except OSError:
+                        # removed by another process sharing the directory
+                        del self.entries[key]
+            if key in self.entries:
+                return data.copy() if isinstance(data, pd.DataFrame) else data
+        data = compute(content)
+        with self.lock:
+            self.entries[key] = data
+            self.store(key, data)
+            while len(self.entries) > self.max_entries:
+                evicted_key, _ = self.entries.popitem(last=False)
+                self.remove(evicted_key)
+        return data.copy() if isinstance(data, pd.DataFrame) else data
+
+    def path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def is_stored(self, key: str) -> bool:
+        if self.directory is None:
+            return False
+        return os.path.exists(self.path(key, ".bin")) or os.path.exists(self.path(key, ".parquet"))
+
+    def store(self, key: str, data) -> None:
+        if self.directory is None:
+            return
+        if isinstance(data, bytes):
+            atomic_write(self.path(key, ".bin"), data)
+        elif isinstance(data, pd.DataFrame) and HAS_PYARROW:
+            tmp_path = self.path(key, f".parquet.{os.getpid()}.tmp")
+            data.to_parquet(tmp_path)
+            os.replace(tmp_path, self.path(key, ".parquet"))
+
+    def load(self, key: str):
+        if os.path.exists(self.path(key, ".bin")):
+            with open(self.path(key, ".bin"), "rb") as file:
+                return file.read()
+        return pd.read_parquet(self.path(key, ".parquet"))
+
+    def remove(self, key: str) -> None:
+        if self.directory is None:
+            return
+        for suffix in (".bin", ".parquet"):
+            try:
+                os.remove(self.path(key, suffix))
+            except FileNotFoundError:
+                pass
@@ -1,11 +1,27 @@
+import copy
 import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import numpy as np
 from io import BytesIO
 from abc import ABC, abstractmethod
 from PIL import Image
-import requests as rq
 import plotly.express as px
 import pandas as pd
 import sys
+from http_client import HttpClient, ApiRequestError
+from output import atomic_write
+from export import figures_to_html, write_plotlyjs
+from rendering import RenderPool
+from memo import ProcessCache, content_digest
+from arrow_io import records_to_frame, to_arrow_backed
+from sharding import ShardPool
+from history import CryptoHistory
+from reports import Report, ReportSink, StreamSink
+from schemas import CryptoTicks, DogMessage, HighwayList, TruckParkList
 # from pathlib import Path
 # sys.path.append(str(Path().resolve()) + "/tests")
 # from model_test_sample_data import *
@@ -16,16 +32,53 @@ class ApiVisualize(ABC):
     Abstract super class, containing the template method (show_me_stuff) and the following sub-functions:
         - required abstract methods (get_api_url, visualize_content)
         - optional methods (process_content)
-        - hook methods (print_report)
+        - hook methods (print_report, which writes the Report of build_report)
     """
 
+    # shared by all instances, so connections and cached responses stay warm between runs
+    client: HttpClient = HttpClient()
+    # seconds between two runs in daemon mode
+    refresh_interval: float = 300
+    # seconds the api content is cached without any request, and seconds it may then still be returned
+    # while being refreshed in the background (stale-while-revalidate)
+    cache_max_age: float = 0
+    stale_while_revalidate: float = 0
+    # expected schema of the api response, see schemas
+    response_type = None
+    # if set, visualizations are written to this directory instead of being shown
+    output_dir: str | None = None
+    # if True, visualizations are never shown, only kept in self.output (e.g. for the http server)
+    headless: bool = False
+    # last rendered visualization as (body, file suffix)
+    output: tuple[bytes, str] | None = None
+    # last plotly figure, e.g. to bundle several figures into one page
+    figure = None
+    # if set, figures in the output directory are additionally exported as static images by this worker pool
+    render_pool: RenderPool | None = None
+    # if set, process_content is skipped for raw content that was already processed
+    process_cache: ProcessCache | None = None
+    # if True, processed data frames use Arrow-backed dtypes (requires pyarrow)
+    arrow_backed: bool = False
+    # destination of the reports, stdout as text by default
+    report_sink: ReportSink = StreamSink()
+    # if set, a json report with the metrics and stage timings of every run is written to this sink
+    run_report_sink: ReportSink | None = None
+    # state updated by the process step, which the pipeline hands back from its worker processes
+    worker_state: tuple[str, ...] = ("stage_seconds", "payload_bytes")
+
     # Template Method
     def show_me_stuff(self) -> None:
-        api_url = self.get_api_url()
-        content = self.api_requests(api_url)
-        data = self.process_content(content)
-        self.print_report(data)
-        self.visualize_data(data)
+        with self.reported_run() as run:
+            with self.stage("fetch"):
+                api_url = self.get_api_url()
+                content = self.api_requests(api_url)
+            with self.stage("process"):
+                run.data = self.process(content)
+                self.track_result(run.data)
+            with self.stage("report"):
+                self.print_report(run.data)
+            with self.stage("visualize"):
+                self.visualize_data(run.data)
         return
 
     # abstract steps that require a sub-class implementation
@@ -42,36 +95,195 @@ class ApiVisualize(ABC):
         return content
 
     def api_requests(self, api_url):
-        res = rq.get(api_url)
-        if res.status_code != 200:
-            print(f"Error: Something didnt work when requesting at {api_url}.")
-            exit()
-        content = res.json()
+        content = self.request_json(api_url, self.response_type)
         return content
 
-    # hook method; optional sub-class implementation, otherwise pass
-    def print_report(self, data):
+    def request_json(self, url: str, response_type=None):
+        """Request json content with the cache policy of this class."""
+        return self.client.get_json(url, self.cache_max_age, self.stale_while_revalidate, response_type)
+
+    def process(self, content):
+        """Run process_content, memoized by the process cache if one is set."""
+        if self.process_cache is None:
+            return self.process_content(content)
+        return self.process_cache.get_or_compute(type(self).__name__, content, self.process_content)
+
+    # hook methods; optional sub-class implementation, otherwise no report
+    def track_result(self, data) -> None:
+        """
+        Update the state kept across runs from the processed data. Runs in the calling process, also in pipeline mode,
+        so that this state never has to be sent back from the worker processes.
+        """
         pass
 
+    def print_report(self, data):
+        """Write the report of this run to the report sink, rendered at once."""
+        report = self.build_report(data)
+        if report is not None:
+            self.report_sink.write(report)
+
+    def build_report(self, data) -> Report | None:
+        return None
+
+    def run_metrics(self, data) -> dict[str, object]:
+        """Metrics of the processed data for the run report, e.g. the number of rows."""
+        if isinstance(data, pd.DataFrame):
+            return {"rows": len(data)}
+        return {}
+
+    # run report helpers, also used by the pipeline, which runs the steps of the template method in different stages
+    def start_run(self) -> None:
+        self.run_started_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        self.stage_seconds: dict[str, float] = {}
+        self.payload_bytes = 0
+
+    @contextmanager
+    def reported_run(self):
+        """
+        Start a run and write its run report when it ends, also if it fails, e.g.
+            with self.reported_run() as run:
+                run.data = self.process(content)
+        """
+        self.start_run()
+        run = SimpleNamespace(data=None)
+        try:
+            yield run
+        except Exception as e:
+            self.write_run_report(None, e)
+            raise
+        self.write_run_report(run.data)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Measure the duration of one step of the template method, and the api payload received during it."""
+        started = time.perf_counter()
+        received = self.client.payload_bytes()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] = time.perf_counter() - started
+            self.payload_bytes += self.client.payload_bytes() - received
+
+    def write_run_report(self, data, error: Exception | None = None) -> None:
+        """Write the report of the run to run_report_sink; failed runs carry their error instead of data metrics."""
+        if self.run_report_sink is None:
+            return
+        metrics = {"started_at": self.run_started_at, "payload_bytes": self.payload_bytes}
+        if error is not None:
+            metrics["error"] = f"{type(error).__name__}: {error}"
+        elif data is not None:
+            metrics.update(self.run_metrics(data))
+        metrics["stage_seconds"] = self.stage_seconds
+        self.run_report_sink.write(Report(self.output_name(), metrics))
+
+    # helper for process_content
+    def extract_columns(self, records: list[dict], columns: dict[str, type], defaults: dict | None = None) -> dict[str, np.ndarray]:
+        """
+        Extract several keys from a list of dictionaries in a single pass, e.g.
+        extract_columns(records, {"id": object, "coordinate.lat": object}), with coordinate.lat for record["coordinate"]["lat"].
+        Every key becomes an array of the given dtype. Keys missing in a record get a copy of their value in defaults,
+        otherwise a KeyError is raised.
+        """
+        defaults = defaults or {}
+        # typed arrays, filled in the single pass; elements of object arrays can also hold lists (e.g. features)
+        arrays = {key: np.empty(len(records), dtype=dtype) for key, dtype in columns.items()}
+        paths = [(arrays[key], key, key.split(".")) for key in columns]
+        for number, record in enumerate(records):
+            for array, key, path in paths:
+                value = record
+                try:
+                    for part in path:
+                        value = value[part]
+                except (KeyError, TypeError):
+                    if key not in defaults:
+                        raise KeyError(f"Record {number} has no value for {key}") from None
+                    # mutable defaults like [] must not be shared between rows
+                    value = copy.copy(defaults[key])
+                array[number] = value
+        return arrays
+
+    # output helpers for visualize_data
+    @classmethod
+    def output_name(cls) -> str:
+        """Short name of the visualization, e.g. crypto for CryptoVisualize"""
+        return cls.__name__.removesuffix("Visualize").lower()
+
+    def output_path(self, suffix: str) -> str:
+        """Path of the output file of this visualization, e.g. <output_dir>/crypto.html"""
+        return os.path.join(self.output_dir, self.output_name() + suffix)
+
+    def is_displayed(self) -> bool:
+        """Whether visualizations are shown to the user instead of being published."""
+        return self.output_dir is None and not self.headless
+
+    def publish(self, body: bytes, suffix: str) -> None:
+        """Keep the rendered visualization and write it to the output directory, if set."""
+        self.output = (body, suffix)
+        if self.output_dir is not None:
+            atomic_write(self.output_path(suffix), body)
+
+    def show_figure(self, fig) -> None:
+        """
+        Show a plotly figure, or publish it as html.
+        Html files in the output directory share one plotly.js bundle and carry their data as binary typed arrays.
+        """
+        self.figure = fig
+        if self.is_displayed():
+            fig.show()
+            return
+        if self.output_dir is None:
+            self.publish(fig.to_html().encode(), ".html")
+            return
+        write_plotlyjs(self.output_dir)
+        self.publish(figures_to_html([fig]).encode(), ".html")
+        if self.render_pool is not None:
+            self.render_pool.submit(fig, self.output_path(""))
+
 class CryptoVisualize(ApiVisualize):
     """
     Example of visualizing the price of bitcoin over a given time period as a line chart.
     """
+    response_type = CryptoTicks
+    # longer time series are downsampled to at most this many points before plotting
+    max_plot_points: int = 4000
+    # slightly stale prices are shown at once, while they are refreshed in the background
+    stale_while_revalidate = 900
+    # if set, the processed ticks are also appended to this persistent history
+    history: CryptoHistory | None = None
+
     def get_api_url(self) -> str:
         return "https://api.coinpaprika.com/v1/tickers/btc-bitcoin/historical?start=2024-07-01&interval=1d"
 
     def process_content(self, content):
         """Transform API response to pandas df."""
+        if self.arrow_backed:
+            return records_to_frame(
+                content,
+                {"timestamp": "time", "price": "price", "volume_24h": "volume_24h", "market_cap": "market_cap"},
+                types={"time": "string", "price": "double", "volume_24h": "double", "market_cap": "double"},
+            )
+        columns = self.extract_columns(
+            content,
+            {"timestamp": object, "price": np.float64, "volume_24h": np.float64, "market_cap": np.float64},
+            defaults={"volume_24h": np.nan, "market_cap": np.nan},
+        )
         df = pd.DataFrame(
             dict(
-                time=self.dict_list_to_value_list(content, "timestamp"),
-                price=self.dict_list_to_value_list(content, "price"),
+                time=columns["timestamp"],
+                price=columns["price"],
+                volume_24h=columns["volume_24h"],
+                market_cap=columns["market_cap"],
             )
         )
         return df
 
     def visualize_data(self, data) -> None:
-        """Create plotly line-chart out of bitcoin data."""
+        """Create plotly line-chart out of bitcoin data, and store the ticks in the history, if set."""
+        # stored in the output stage, which runs in the main process also in pipeline mode
+        if self.history is not None:
+            self.history.append(data)
+        if len(data) > self.max_plot_points:
+            data = self.downsample(data, "price", self.max_plot_points)
         fig = px.line(
             data,
             x="time",
@@ -83,95 +295,317 @@ class CryptoVisualize(ApiVisualize):
                 size=30,
             )
         )
-        fig.show()
+        self.show_figure(fig)
         return
 
-    def print_report(self, df):
-        """Print different metrics of the bitcoin data."""
-        price_stats = df["price"].describe()
-        metrics = {
-            "Number of data points": price_stats["count"],
-            "Price stats": None,
-            "\tMinimum": price_stats.loc["min"],
-            "\tMaximum": price_stats.loc["max"],
-            "\tMean": price_stats.loc["mean"],
-            "\tStd": price_stats.loc["std"],
-        }
-        print("-----------------------")
-        print("Report for crypto data:")
-        for text, value in metrics.items():
-            print(f"{text}: {f'{value: .2f}' if value is not None else ""}")
-        print("-----------------------")
+    def downsample(self, data: pd.DataFrame, column: str, max_points: int) -> pd.DataFrame:
+        """
+        Min/max-per-bucket downsampling: split the time-ordered rows into max_points // 2 buckets and keep
+        the rows with the minimal and maximal value of each bucket, so peaks and the overall shape are preserved.
+        Missing values are ignored; buckets without any value are skipped.
+        """
+        n_buckets = max(max_points // 2, 1)
+        values = data[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        bucket_starts = np.unique(np.arange(n_buckets) * len(values) // n_buckets)
+        buckets = np.repeat(np.arange(len(bucket_starts)), np.diff(bucket_starts, append=len(values)))
+        keep = []
+        # fmin and fmax ignore NaN, unless the whole bucket is NaN, which then matches no row
+        for reduce in [np.fmin, np.fmax]:
+            # first row of every bucket reaching the bucket's extreme value
+            extremes = np.flatnonzero(values == reduce.reduceat(values, bucket_starts)[buckets])
+            keep.append(extremes[np.unique(buckets[extremes], return_index=True)[1]])
+        keep = np.unique(np.concatenate(keep))
+        return data.iloc[keep]
 
-    def dict_list_to_value_list(self, dictList: list[dict], key: str):
-        """Transform a list of dictionaries to a list of values of a specified key in those dictionaries."""
-        valueList: list = []
-        for dictionary in dictList:
-            value = dictionary[key]
-            valueList.append(value)
-        return valueList
+    def build_report(self, df):
+        """Report different metrics of the bitcoin data."""
+        price_stats = df["price"].describe()
+        return Report(
+            "crypto",
+            {
+                "Number of data points": price_stats["count"],
+                "Price stats": {
+                    "Minimum": price_stats.loc["min"],
+                    "Maximum": price_stats.loc["max"],
+                    "Mean": price_stats.loc["mean"],
+                    "Std": price_stats.loc["std"],
+                },
+            },
+        )
 
 
 class DogVisualize(ApiVisualize):
     """
     Example of displaying a random dog picture.
     """
+    refresh_interval = 60
+    response_type = DogMessage
+
     def get_api_url(self):
         return "https://dog.ceo/api/breeds/image/random"
 
     def process_content(self, content):
         """Transform API response to image data"""
         picture_url = content["message"]
-        data = rq.get(picture_url).content
+        data = self.client.get_bytes(picture_url)
         return data
 
+    def run_metrics(self, data):
+        """Size, dimensions and format of the image, read from its header only."""
+        image = Image.open(BytesIO(data))
+        return {"image_bytes": len(data), "image_width": image.width, "image_height": image.height, "image_format": image.format}
+
     def visualize_data(self, data):
-        """Display the image"""
+        """Display the image, or publish it."""
         image = Image.open(BytesIO(data))
-        image.show()
+        if self.is_displayed():
+            image.show()
+            return
+        # data may be a view of a shared memory block, the published output has to outlive it
+        self.publish(bytes(data), "." + image.format.lower())
 
 
 class AutobahnVisualize(ApiVisualize):
     """
     Example of visualizing different highway truck parks and colorcoding them according to their corresponding Autobahn.
     """
+    refresh_interval = 600
+
+    # bit of every truck park feature in the features_mask column, and the pattern of api feature names matching it
+    FEATURES: dict[str, tuple[int, str]] = {
+        "restaurant": (1 << 0, r"^(?!restaurant\.notAvailable).*(?:Restaurant|[Rr]aststätte)"),
+        "fuel": (1 << 1, r"Tankstelle"),
+        "shop": (1 << 2, r"Geschäft|^Kiosk"),
+        "toilet": (1 << 3, r"Toilette"),
+        "shower": (1 << 4, r"Dusche"),
+        "picnic": (1 << 5, r"Picknick"),
+        "bin": (1 << 6, r"Mülleimer"),
+        "wifi": (1 << 7, r"WLAN"),
+        "toll_terminal": (1 << 8, r"Mautterminal"),
+        "defibrillator": (1 << 9, r"Defibrillator"),
+        "atm": (1 << 10, r"Geldautomat"),
+        "playground": (1 << 11, r"Spielplatz"),
+        "vending_machine": (1 << 12, r"Warenautomat"),
+        "hotel": (1 << 13, r"Hotel|Motel"),
+        "fax": (1 << 14, r"Faxgerät"),
+        "phone": (1 << 15, r"Telefon"),
+        "docstop": (1 << 16, r"Docstop"),
+        "charging_station": (1 << 17, r"Ladestation"),
+        "copier": (1 << 18, r"Kopierer"),
+    }
+    # above this number of truck parks, visualize_data renders a clustered WebGL map instead of scatter_geo
+    high_volume_threshold: int = 5000
+    # maximal number of points sent to the browser in high volume mode
+    max_map_points: int = 20000
+    # map style of the high volume map, can also be the url of a locally served style.json
+    map_style: str = "carto-positron"
+    # if set, the highways are processed in shards by this worker pool
+    shard_pool: ShardPool | None = None
+    # the snapshot stays in the worker processes of a pipeline, it only saves processing within the same process
+    worker_state = (*ApiVisualize.worker_state, "content_digests")
+
+    def __init__(self):
+        # processed truck parks of the previous run per highway, keyed by the hash of the highway's raw content
+        self.snapshot: dict[str, pd.DataFrame] = {}
+        # hashes of the highways' raw content and of every truck park of the previous run, see track_result
+        self.highway_digests: set[str] = set()
+        # hashes of the highways' raw content of the last processed content, not yet tracked
+        self.content_digests: set[str] = set()
+        self.park_hashes: pd.DataFrame | None = None
+        # differences to the previous run, see compare_park_hashes
+        self.changes: dict | None = None
+
     def get_api_url(self):
         return "https://api.deutschland-api.dev/autobahn"
 
     def process_content(self, content):
-        """Transform API response to pandas dataframe and prepare data for visualization."""
-        all_autobahns_truck_parks_df: pd.DataFrame = pd.DataFrame()
-        for highway in content:
-            highway_df = pd.json_normalize(highway)
-            all_autobahns_truck_parks_df = pd.concat([all_autobahns_truck_parks_df, highway_df], axis=0)
-        all_autobahns_truck_parks_df[["Autobahn", "city"]] = (
-            all_autobahns_truck_parks_df
-            ["title"]
-            .str.split(" \\| ", n=1, expand=True)
+        """
+        Transform API response to pandas dataframe and prepare data for visualization.
+        Only highways whose raw content changed since the previous run are processed again,
+        with a shard pool across its worker processes.
+        """
+        previous_snapshot = self.snapshot
+        self.snapshot = {}
+        digests = [content_digest(highway) for highway in content]
+        new_highways = {}
+        for digest, highway in zip(digests, content):
+            if digest in previous_snapshot:
+                self.snapshot[digest] = previous_snapshot[digest]
+            elif digest not in new_highways:
+                new_highways[digest] = highway
+        if self.shard_pool is not None:
+            frames = self.shard_pool.process_highways(type(self), list(new_highways.values()))
+        else:
+            frames = [self.process_highway(highway) for highway in new_highways.values()]
+        self.snapshot.update(zip(new_highways.keys(), frames))
+        all_autobahns_truck_parks_df: pd.DataFrame = pd.concat(
+            [self.snapshot[digest] for digest in digests],
+            ignore_index=True,
         )
-        all_autobahns_truck_parks_df = all_autobahns_truck_parks_df.drop(columns=["title", "id"])
+        all_autobahns_truck_parks_df["Autobahn"], all_autobahns_truck_parks_df["city"] = self.split_title(all_autobahns_truck_parks_df["title"])
+        all_autobahns_truck_parks_df = all_autobahns_truck_parks_df.drop(columns=["title"])
+        if self.arrow_backed:
+            all_autobahns_truck_parks_df = to_arrow_backed(all_autobahns_truck_parks_df)
         return all_autobahns_truck_parks_df
 
+    def process(self, content):
+        """Hash the highways here, so that the changes can also be tracked if the result was cached."""
+        data = super().process(content)
+        self.content_digests = {content_digest(highway) for highway in content}
+        return data
+
+    def process_highway(self, truck_parks: list[dict]) -> pd.DataFrame:
+        """Normalize the truck parks of one highway and parse their descriptions and features."""
+        highway_df = pd.DataFrame(self.extract_columns(
+            truck_parks,
+            {
+                "id": object,
+                "title": object,
+                "subtitle": object,
+                "description": object,
+                "coordinate.lat": object,
+                "coordinate.long": object,
+                "features": object,
+            },
+            defaults={"description": [], "features": []},
+        ))
+        highway_df[["car_spots", "lorry_spots"]] = self.parse_spots(highway_df["description"])
+        highway_df["features_mask"] = self.encode_features(highway_df["features"])
+        highway_df = highway_df.drop(columns=["description", "features"])
+        return highway_df
+
+    def track_result(self, data: pd.DataFrame) -> None:
+        """Compare the processed truck parks with the previous run and store the differences in changes."""
+        highway_digests = self.content_digests
+        park_hashes = pd.DataFrame({
+            "id": data["id"].to_numpy(dtype=object),
+            "row_hash": pd.util.hash_pandas_object(data.drop(columns=["id"]), index=False).to_numpy(),
+        })
+        self.changes = None
+        if self.park_hashes is not None:
+            self.changes = {
+                **self.compare_park_hashes(self.park_hashes, park_hashes),
+                "reprocessed_highways": len(highway_digests - self.highway_digests),
+            }
+        self.highway_digests = highway_digests
+        self.park_hashes = park_hashes
+
+    def compare_park_hashes(self, previous_park_hashes: pd.DataFrame, park_hashes: pd.DataFrame) -> dict:
+        """Hash-join the truck parks of two runs on their id and report added, removed and changed parks."""
+        joined = previous_park_hashes.merge(
+            park_hashes,
+            on="id",
+            how="outer",
+            suffixes=("_previous", ""),
+            indicator=True,
+        )
+        both = joined["_merge"] == "both"
+        return {
+            "added": joined.loc[joined["_merge"] == "right_only", "id"].tolist(),
+            "removed": joined.loc[joined["_merge"] == "left_only", "id"].tolist(),
+            "changed": joined.loc[both & (joined["row_hash_previous"] != joined["row_hash"]), "id"].tolist(),
+        }
+
+    def build_report(self, data):
+        """Report the number of truck parks and the changes since the previous run."""
+        metrics = {"Number of truck parks": len(data)}
+        if self.changes is not None:
+            metrics["Changes since previous run"] = {
+                "Added": len(self.changes["added"]),
+                "Removed": len(self.changes["removed"]),
+                "Changed": len(self.changes["changed"]),
+                "Highways reprocessed": self.changes["reprocessed_highways"],
+            }
+        return Report("autobahn", metrics)
+
+    def run_metrics(self, data):
+        """Number of truck parks in total and per highway."""
+        counts = data["Autobahn"].value_counts(sort=False)
+        return {
+            **super().run_metrics(data),
+            "truck_parks_per_highway": {str(highway): int(count) for highway, count in counts.items()},
+            "reprocessed_highways": self.changes["reprocessed_highways"] if self.changes is not None else len(self.highway_digests),
+        }
+
+    def split_title(self, titles: pd.Series) -> tuple[pd.Categorical, pd.Categorical]:
+        """Split titles like "A1 | Puttgarden" into categorical Autobahn and city columns."""
+        # only the few distinct titles are split, the rows keep their integer codes
+        title_codes, distinct_titles = pd.factorize(titles)
+        parts = (
+            pd.Series(distinct_titles)
+            .str.split(" | ", n=1, expand=True, regex=False)
+            .reindex(columns=[0, 1])
+        )
+        columns = []
+        for part in [parts[0], parts[1]]:
+            part_codes, part_categories = pd.factorize(part)
+            codes = np.where(title_codes >= 0, part_codes[title_codes], -1)
+            columns.append(pd.Categorical.from_codes(codes, part_categories))
+        return columns[0], columns[1]
+
+    def parse_spots(self, descriptions: pd.Series) -> pd.DataFrame:
+        """Extract the number of car and lorry spots from descriptions like ["PKW Stellplätze: 42", "LKW Stellplätze: 36"]."""
+        spots = (
+            descriptions
+            .explode()
+            .str.extract(r"^(PKW|LKW) Stellpl\w*: (\d+)")
+            .dropna()
+        )
+        spots_df = pd.DataFrame(0, index=descriptions.index, columns=["car_spots", "lorry_spots"], dtype=np.int16)
+        for kind, column in [("PKW", "car_spots"), ("LKW", "lorry_spots")]:
+            kind_spots = spots[spots[0] == kind][1].astype(np.int16)
+            spots_df.loc[kind_spots.index, column] = kind_spots
+        return spots_df
+
+    def encode_features(self, features: pd.Series) -> np.ndarray:
+        """Encode the feature lists of all truck parks as one bitmask per park, see FEATURES."""
+        exploded = features.explode().dropna()
+        names = pd.Index(exploded.unique())
+        name_bits = np.zeros(len(names), dtype=np.uint32)
+        for bit, pattern in self.FEATURES.values():
+            name_bits[np.asarray(names.str.contains(pattern), dtype=bool)] |= bit
+        mask = np.zeros(len(features), dtype=np.uint32)
+        np.bitwise_or.at(
+            mask,
+            features.index.get_indexer(exploded.index),
+            name_bits[names.get_indexer(exploded)],
+        )
+        return mask
+
+    def has_features(self, data: pd.DataFrame, *features: str) -> pd.Series:
+        """Boolean mask of the truck parks offering all given features, e.g. has_features(data, "restaurant", "fuel")."""
+        bits = 0
+        for feature in features:
+            bits |= self.FEATURES[feature][0]
+        return (data["features_mask"] & bits) == bits
+
     def api_requests(self, api_url):
         """Request highway names, then request truck parks for individual highways."""
         content_highways = (
-            super()
-            .api_requests(api_url)
+            self
+            .request_json(api_url, HighwayList)
             ["entries"][:10]
         )
         all_truck_parks = []
         for highway in content_highways:
-            url = f"https://api.deutschland-api.dev/autobahn/{highway}/parking_lorry"
-            truck_parks = (
-                super()
-                .api_requests(url)
-                ["entries"]
-            )
-            all_truck_parks.append(truck_parks)
+            all_truck_parks.append(self.fetch_highway(highway))
         return all_truck_parks
 
+    def fetch_highway(self, highway: str) -> list[dict]:
+        """Request the truck parks of one highway."""
+        url = f"https://api.deutschland-api.dev/autobahn/{highway}/parking_lorry"
+        truck_parks = (
+            self
+            .request_json(url, TruckParkList)
+            ["entries"]
+        )
+        return truck_parks
+
     def visualize_data(self, data):
         """Visualize the highway truck parks as a plotly map-chart."""
+        if len(data) > self.high_volume_threshold:
+            self.visualize_high_volume(data)
+            return
         fig = px.scatter_geo(
             data,
             lat="coordinate.lat",
@@ -185,7 +619,8 @@ class AutobahnVisualize(ApiVisualize):
             scope="europe",
             hover_data={
                 "subtitle": False,
-                "description": True,
+                "car_spots": True,
+                "lorry_spots": True,
                 "Autobahn": True,
                 "coordinate.lat": False,
                 "coordinate.long": False,
@@ -205,5 +640,49 @@ class AutobahnVisualize(ApiVisualize):
             showsubunits=True,
             showcoastlines=True,
         )
-        fig.show()
-        return
\ No newline at end of file
+        self.show_figure(fig)
+        return
+
+    def visualize_high_volume(self, data):
+        """Visualize many truck parks as WebGL map with client-side clustering and a slim hover."""
+        data = self.decimate(data, self.max_map_points)
+        fig = px.scatter_map(
+            data,
+            lat=data["coordinate.lat"].astype(np.float32),
+            lon=data["coordinate.long"].astype(np.float32),
+            hover_name="subtitle",
+            color="Autobahn",
+            center={
+                "lat": 50.6085868697721,
+                "lon": 9.032501742251238,
+            },
+            zoom=5,
+            map_style=self.map_style,
+            hover_data={"lorry_spots": True},
+        )
+        fig.update_traces(cluster={"enabled": True, "maxzoom": 9})
+        self.show_figure(fig)
+        return
+
+    def decimate(self, data: pd.DataFrame, max_points: int) -> pd.DataFrame:
+        """
+        Keep one truck park per Autobahn and grid cell, with the cells as small as possible for at most max_points parks.
+        If there are more Autobahns than max_points, the first max_points Autobahns keep one park each.
+        """
+        if len(data) <= max_points:
+            return data
+        lat = data["coordinate.lat"].astype(float).to_numpy()
+        lon = data["coordinate.long"].astype(float).to_numpy()
+        cell_size = 0.01
+        # beyond 360 degrees, the cells cannot become any coarser
+        while cell_size <= 360:
+            cells = pd.DataFrame({
+                "Autobahn": data["Autobahn"].to_numpy(),
+                "row": np.floor(lat / cell_size).astype(np.int64),
+                "col": np.floor(lon / cell_size).astype(np.int64),
+            })
+            keep = ~cells.duplicated().to_numpy()
+            if keep.sum() <= max_points:
+                return data[keep]
+            cell_size *= 2
+        return data[~data["Autobahn"].duplicated().to_numpy()].head(max_points)
@@ -0,0 +1,152 @@
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from model import ApiVisualize
+from shared_results import SharedResult, can_share, share
+
+
+def worker_settings() -> dict:
+    """Class-wide settings of ApiVisualize, which worker processes started by forkserver do not inherit."""
+    return {"process_cache": ApiVisualize.process_cache, "arrow_backed": ApiVisualize.arrow_backed}
+
+
+def configure_worker(settings: dict) -> None:
+    """Initializer of the worker processes: apply the settings of the parent process."""
+    for name, value in settings.items():
+        setattr(ApiVisualize, name, value)
+
+
+def process_job(visualization_object: ApiVisualize, content, share_result: bool = False):
+    """
+    CPU stage, run in a worker process: returns the worker_state of the (copied) object, since process may update it.
+    With share_result, data frames and bytes are handed back in shared memory instead of being pickled.
+    """
+    with visualization_object.stage("process"):
+        data = visualization_object.process(content)
+    if share_result and can_share(data):
+        data = share(data)
+    return {name: getattr(visualization_object, name) for name in visualization_object.worker_state}, data
+
+
+class Pipeline:
+    """
+    Runs the steps of the template method for many ApiVisualize objects as a staged pipeline:
+        - fetch (threads): get_api_url, api_requests
+        - process (worker processes): process_content
+        - output (calling thread): print_report, visualize_data
+    The stages are connected by bounded queues, so a slow stage holds back the ones before it (backpressure)
+    and the total time approaches the time of the slowest stage instead of the sum of all stages.
+    With shared_memory, processed data frames and images reach the output stage through shared memory blocks,
+    which are released once the output of the job is done.
+    The worker processes get the process cache and dtype backend of ApiVisualize; a given executor has to use configure_worker itself.
+    """
+
+    def __init__(self, fetch_workers: int = 4, executor: Executor | None = None, queue_size: int = 8, shared_memory: bool = False):
+        self.fetch_workers = fetch_workers
+        self.executor = executor
+        self.queue_size = queue_size
+        self.shared_memory = shared_memory
+
+    def run(self, visualization_objects: list[ApiVisualize]) -> list[tuple[ApiVisualize, Exception | None]]:
+        """
+        Run all objects and return them in order of completion, together with the error that stopped them, if any.
+        Every job yields exactly one result, also if its worker process dies; the worker_state that process updated
+        in the worker process is copied back to the given objects.
+        """
+        # the pipeline is multi-threaded, so worker processes must not be forked from it
+        executor = self.executor or ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=configure_worker,
+            initargs=(worker_settings(),),
+        )
+        jobs: queue.Queue = queue.Queue()
+        for visualization_object in visualization_objects:
+            jobs.put(visualization_object)
+        fetched: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # unbounded, the process stage is limited by processing_slots, which are only freed by the output stage
+        processed: queue.Queue = queue.Queue()
+        processing_slots = threading.Semaphore(self.queue_size)
+
+        def fetch():
+            while True:
+                try:
+                    visualization_object = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    visualization_object.start_run()
+                    with visualization_object.stage("fetch"):
+                        content = visualization_object.api_requests(visualization_object.get_api_url())
+                except Exception as e:
+                    processed.put((visualization_object, None, e, False))
+                    continue
+                fetched.put((visualization_object, content))
+
+        def dispatch():
+            try:
+                while (item := fetched.get()) is not None:
+                    visualization_object, content = item
+                    processing_slots.acquire()
+                    try:
+                        future = executor.submit(process_job, visualization_object, content, self.shared_memory)
+                    except Exception as e:
+                        # e.g. BrokenProcessPool after a worker process died
+                        processed.put((visualization_object, None, e, True))
+                        continue
+                    future.add_done_callback(lambda future, original=visualization_object: finish(future, original))
+            except BaseException as e:
+                # report the jobs that were not dispatched, so the output stage does not wait for them forever
+                while (item := fetched.get()) is not None:
+                    processed.put((item[0], None, e, False))
+                raise
+
+        def finish(future, original):
+            try:
+                worker_state, data = future.result()
+            except BaseException as e:
+                processed.put((original, None, e, True))
+                return
+            for name, value in worker_state.items():
+                setattr(original, name, value)
+            processed.put((original, data, None, True))
+
+        def close_fetch_stage():
+            for thread in fetch_threads:
+                thread.join()
+            fetched.put(None)
+
+        fetch_threads = [threading.Thread(target=fetch, daemon=True) for _ in range(self.fetch_workers)]
+        for thread in fetch_threads + [threading.Thread(target=dispatch, daemon=True), threading.Thread(target=close_fetch_stage, daemon=True)]:
+            thread.start()
+
+        results = []
+        try:
+            for _ in visualization_objects:
+                visualization_object, data, error, used_slot = processed.get()
+                if used_slot:
+                    processing_slots.release()
+                shared_result = data if isinstance(data, SharedResult) else None
+                if error is None:
+                    try:
+                        if shared_result is not None:
+                            data = shared_result.attach()
+                        visualization_object.track_result(data)
+                        with visualization_object.stage("report"):
+                            visualization_object.print_report(data)
+                        with visualization_object.stage("visualize"):
+                            visualization_object.visualize_data(data)
+                    except Exception as e:
+                        error = e
+                try:
+                    visualization_object.write_run_report(data if error is None else None, error)
+                except Exception as e:
+                    error = error or e
+                if shared_result is not None:
+                    data = None
+                    shared_result.release()
+                results.append((visualization_object, error))
+        finally:
+            if self.executor is None:
+                executor.shutdown()
+        return results
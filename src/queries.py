@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+import numpy as np
+from history import CryptoHistory, to_datetime64
+
+# periods of the precomputed OHLC bars, from the finest to the coarsest
+PERIODS: dict[str, np.timedelta64] = {
+    "hour": np.timedelta64(1, "h"),
+    "day": np.timedelta64(1, "D"),
+}
+
+
+@dataclass(frozen=True)
+class OHLC:
+    open: float
+    high: float
+    low: float
+    close: float
+
+    def merge(self, later: "OHLC") -> "OHLC":
+        """OHLC of this and a directly following interval."""
+        return OHLC(self.open, max(self.high, later.high), min(self.low, later.low), later.close)
+
+
+class OHLCBars:
+    """
+    OHLC bars of one period (e.g. hourly), aggregated incrementally from a growing, time-sorted tick series.
+    update() only looks at the ticks added since the previous update; the last bar may be extended by them.
+    """
+
+    COLUMNS = ["open", "high", "low", "close"]
+
+    def __init__(self, period: np.timedelta64):
+        self.period = period.astype("timedelta64[ns]")
+        # number of ticks aggregated so far
+        self.rows = 0
+        self.length = 0
+        self.arrays: dict[str, np.ndarray] = {
+            "start": np.empty(0, dtype="datetime64[ns]"),
+            **{column: np.empty(0, dtype=np.float64) for column in self.COLUMNS},
+        }
+
+    def update(self, times: np.ndarray, prices: np.ndarray) -> None:
+        if len(times) <= self.rows:
+            return
+        new_times, new_prices = times[self.rows:], prices[self.rows:]
+        period = self.period.astype(np.int64)
+        bucket_starts = (new_times.astype(np.int64) // period * period).astype("datetime64[ns]")
+        # positions where a new bar starts within the new ticks
+        boundaries = np.flatnonzero(np.concatenate(([True], bucket_starts[1:] != bucket_starts[:-1])))
+        bars = {
+            "start": bucket_starts[boundaries],
+            "open": new_prices[boundaries],
+            "high": np.maximum.reduceat(new_prices, boundaries),
+            "low": np.minimum.reduceat(new_prices, boundaries),
+            "close": new_prices[np.append(boundaries[1:], len(new_prices)) - 1],
+        }
+        if self.length and bars["start"][0] == self.arrays["start"][self.length - 1]:
+            # the first new bar continues the last stored one
+            last = self.length - 1
+            self.arrays["high"][last] = max(self.arrays["high"][last], bars["high"][0])
+            self.arrays["low"][last] = min(self.arrays["low"][last], bars["low"][0])
+            self.arrays["close"][last] = bars["close"][0]
+            bars = {column: values[1:] for column, values in bars.items()}
+        self.append(bars)
+        self.rows = len(times)
+
+    def append(self, bars: dict[str, np.ndarray]) -> None:
+        new_length = self.length + len(bars["start"])
+        if new_length > len(self.arrays["start"]):
+            capacity = max(new_length, 2 * len(self.arrays["start"]), 64)
+            for column, array in self.arrays.items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:self.length] = array[:self.length]
+                self.arrays[column] = grown
+        for column, values in bars.items():
+            self.arrays[column][self.length:new_length] = values
+        self.length = new_length
+
+    def bars(self, start=None, end=None) -> dict[str, np.ndarray]:
+        """Bars starting in [start, end), as views of the aggregated arrays."""
+        starts = self.arrays["start"][:self.length]
+        first = 0 if start is None else int(np.searchsorted(starts, to_datetime64(start)))
+        last = self.length if end is None else int(np.searchsorted(starts, to_datetime64(end)))
+        return {column: array[first:max(first, last)] for column, array in self.arrays.items()}
+
+
+class TickQuery:
+    """
+    Time-window queries over a CryptoHistory:
+        - price_at(t): price of the last tick at or before t
+        - ohlc(start, end): open, high, low and close of the ticks in [start, end)
+        - window(start, end) and bars(period, start, end): columns as NumPy views, without copying
+    All lookups are binary searches. Long OHLC ranges are answered from the precomputed bars of PERIODS
+    and only their uncovered edges from the ticks. Every query first updates the bars incrementally by refresh().
+    Queries hold the lock of the history, so they are safe while other threads append to it.
+    """
+
+    def __init__(self, history: CryptoHistory):
+        self.history = history
+        self.ohlc_bars = {name: OHLCBars(period) for name, period in PERIODS.items()}
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Aggregate the ticks appended to the history since the previous refresh."""
+        with self.history.lock:
+            # times and prices of the same rows, also if the history grows meanwhile
+            length = len(self.history)
+            if all(bars.rows == length for bars in self.ohlc_bars.values()):
+                return
+            times = self.history.times[:length]
+            prices = self.history.columns["price"][:length]
+            for bars in self.ohlc_bars.values():
+                bars.update(times, prices)
+
+    def window(self, start=None, end=None) -> dict[str, np.ndarray]:
+        with self.history.lock:
+            self.refresh()
+            return self.ticks(start, end)
+
+    def ticks(self, start=None, end=None) -> dict[str, np.ndarray]:
+        rows = self.history.slice(start, end)
+        if not len(self.history):
+            return {column: np.empty(0, dtype=dtype) for column, dtype in self.history.COLUMNS.items()}
+        return {column: self.history.columns[column][rows] for column in self.history.COLUMNS}
+
+    def bars(self, period: str, start=None, end=None) -> dict[str, np.ndarray]:
+        with self.history.lock:
+            self.refresh()
+            return self.ohlc_bars[period].bars(start, end)
+
+    def price_at(self, time) -> float:
+        with self.history.lock:
+            self.refresh()
+            position = int(np.searchsorted(self.history.times, to_datetime64(time), side="right")) - 1
+            if position < 0:
+                raise KeyError(f"No price at or before {time}")
+            return float(self.history.columns["price"][position])
+
+    def ohlc(self, start, end) -> OHLC:
+        with self.history.lock:
+            self.refresh()
+            result = self.ohlc_between(to_datetime64(start), to_datetime64(end), len(self.ohlc_bars) - 1)
+        if result is None:
+            raise KeyError(f"No ticks between {start} and {end}")
+        return result
+
+    def ohlc_between(self, start: np.datetime64, end: np.datetime64, level: int) -> OHLC | None:
+        """OHLC of [start, end) from the bars of PERIODS up to level, the edges they do not cover from finer data."""
+        if start >= end:
+            return None
+        if level < 0:
+            prices = self.ticks(start, end)["price"]
+            if not len(prices):
+                return None
+            return OHLC(float(prices[0]), float(prices.max()), float(prices.min()), float(prices[-1]))
+        bars = list(self.ohlc_bars.values())[level]
+        # bars lying completely inside [start, end)
+        inner = bars.bars(start, end - bars.period + np.timedelta64(1, "ns"))
+        if not len(inner["start"]):
+            return self.ohlc_between(start, end, level - 1)
+        parts = [
+            self.ohlc_between(start, inner["start"][0], level - 1),
+            OHLC(float(inner["open"][0]), float(inner["high"].max()), float(inner["low"].min()), float(inner["close"][-1])),
+            self.ohlc_between(inner["start"][-1] + bars.period, end, level - 1),
+        ]
+        result = None
+        for part in parts:
+            if part is not None:
+                result = part if result is None else result.merge(part)
+        return result
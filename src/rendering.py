@@ -0,0 +1,63 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+import plotly.io as pio
+from output import atomic_write
+
+
+def warm_up_renderer() -> None:
+    """Start the kaleido renderer of a worker process once, so the first real figure does not pay for it."""
+    pio.to_image({"data": [], "layout": {}}, format="png", width=10, height=10)
+
+
+def render_image(figure_json: str, path: str, image_format: str) -> str:
+    """Render a figure, given as plotly json, to a static image file."""
+    image = pio.to_image(pio.from_json(figure_json), format=image_format)
+    atomic_write(path, image)
+    return path
+
+
+class RenderPool:
+    """
+    Persistent pool of worker processes with warm kaleido renderers for static image export.
+    Figures are submitted without waiting, so rendering overlaps with fetching and processing the next visualization.
+    Static image export requires the optional kaleido package.
+    """
+
+    def __init__(self, workers: int | None = None, image_format: str = "png"):
+        self.image_format = image_format
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=warm_up_renderer,
+        )
+        self.pending: list[Future] = []
+
+    def submit(self, fig, path_without_suffix: str) -> Future:
+        """Render fig to <path_without_suffix>.<image_format> in a worker process."""
+        future = self.executor.submit(
+            render_image,
+            fig.to_json(),
+            f"{path_without_suffix}.{self.image_format}",
+            self.image_format,
+        )
+        self.pending.append(future)
+        return future
+
+    def collect_done(self) -> list[Future]:
+        """Remove and return the finished renderings, without waiting for the others."""
+        done = []
+        pending = []
+        for future in self.pending:
+            (done if future.done() else pending).append(future)
+        self.pending = pending
+        return done
+
+    def wait(self) -> list[str]:
+        """Wait for all submitted figures and return the written paths, raising the first rendering error."""
+        done, _ = wait(self.pending)
+        self.pending = []
+        return [future.result() for future in done]
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
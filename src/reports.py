@@ -0,0 +1,167 @@
+import csv
+import io
+import json
+import os
+import queue
+import sys
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import TextIO
+
+REPORT_FORMATS = ["text", "json", "csv"]
+
+
+def plain_value(value):
+    """NumPy scalars as plain Python values, so that they can be rendered as json."""
+    return value.item() if hasattr(value, "item") else value
+
+
+@dataclass
+class Report:
+    """
+    Structured result of print_report: a title and metrics, where a metric can also be a group of metrics,
+    e.g. Report("crypto", {"Number of data points": 30, "Price stats": {"Minimum": 54000.0}}).
+    """
+    title: str
+    metrics: dict[str, object] = field(default_factory=dict)
+
+    def flat_metrics(self) -> dict[str, object]:
+        """Metrics with groups flattened into "group.metric" names."""
+        flat = {}
+        for name, value in self.metrics.items():
+            if isinstance(value, dict):
+                flat.update({f"{name}.{inner_name}": inner_value for inner_name, inner_value in value.items()})
+            else:
+                flat[name] = value
+        return flat
+
+    def to_text(self) -> str:
+        lines = ["-----------------------", f"Report for {self.title} data:"]
+        for name, value in self.metrics.items():
+            if isinstance(value, dict):
+                lines.append(f"{name}:")
+                lines.extend(f"\t{inner_name}: {format_value(inner_value)}" for inner_name, inner_value in value.items())
+            else:
+                lines.append(f"{name}: {format_value(value)}")
+        lines.append("-----------------------")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> str:
+        """One line of json, so that reports can be collected as json lines."""
+        metrics = {
+            name: {inner_name: plain_value(inner_value) for inner_name, inner_value in value.items()} if isinstance(value, dict) else plain_value(value)
+            for name, value in self.metrics.items()
+        }
+        return json.dumps({"report": self.title, "metrics": metrics}) + "\n"
+
+    def to_csv(self) -> str:
+        """Rows of report,metric,value."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows([self.title, name, plain_value(value)] for name, value in self.flat_metrics().items())
+        return buffer.getvalue()
+
+    def render(self, report_format: str = "text") -> str:
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"report format has to be one of {REPORT_FORMATS}")
+        return getattr(self, f"to_{report_format}")()
+
+
+def format_value(value) -> str:
+    if isinstance(value, float) or hasattr(value, "dtype") and value.dtype.kind == "f":
+        return f"{value: .2f}"
+    return str(value)
+
+
+class ReportSink(ABC):
+    """Destination of rendered reports. Every report is written with a single write, so reports never interleave."""
+
+    def __init__(self, report_format: str = "text"):
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"report format has to be one of {REPORT_FORMATS}")
+        self.report_format = report_format
+        self.lock = threading.Lock()
+
+    def write(self, report: Report) -> None:
+        text = report.render(self.report_format)
+        with self.lock:
+            self.write_text(text)
+
+    @abstractmethod
+    def write_text(self, text: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class StreamSink(ReportSink):
+    """Write reports to a text stream, stdout by default."""
+
+    def __init__(self, stream: TextIO | None = None, report_format: str = "text"):
+        super().__init__(report_format)
+        self.stream = stream
+
+    def write_text(self, text: str) -> None:
+        # resolved on every write, so that redirections of sys.stdout are respected
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
+
+class FileSink(ReportSink):
+    """Append reports to a file. Every report is one append-mode write, so concurrent writers never tear a report."""
+
+    def __init__(self, path: str, report_format: str = "json"):
+        super().__init__(report_format)
+        self.path = path
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def write_text(self, text: str) -> None:
+        data = text.encode()
+        written = os.write(self.fd, data)
+        # regular files only write partially on errors like a full disk
+        if written != len(data):
+            raise OSError(f"Report was written only partially to {self.path}")
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class AsyncSink(ReportSink):
+    """
+    Hand reports to a background thread that writes them to another sink, so that reporting never blocks the caller.
+    Reports are rendered by the background thread too. If the queue is full, new reports are dropped and counted.
+    """
+
+    def __init__(self, sink: ReportSink, max_pending: int = 1000):
+        super().__init__(sink.report_format)
+        self.sink = sink
+        self.pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def write(self, report: Report) -> None:
+        try:
+            self.pending.put_nowait(report)
+        except queue.Full:
+            self.dropped += 1
+
+    def write_text(self, text: str) -> None:
+        """Write already rendered text to the wrapped sink, in the calling thread."""
+        self.sink.write_text(text)
+
+    def run(self) -> None:
+        while (report := self.pending.get()) is not None:
+            try:
+                self.sink.write(report)
+            except Exception as e:
+                print(f"Error: writing report failed: {e}", file=sys.stderr)
+
+    def close(self) -> None:
+        """Write the pending reports and close the wrapped sink."""
+        self.pending.put(None)
+        self.thread.join()
+        self.sink.close()
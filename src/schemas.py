@@ -0,0 +1,41 @@
+from typing import NotRequired, TypedDict
+
+# Declarative schemas of the api responses. Decoders that support them (msgspec) decode and validate in one pass.
+
+
+class CryptoTick(TypedDict):
+    timestamp: str
+    price: float
+    volume_24h: NotRequired[float]
+    market_cap: NotRequired[float]
+
+
+class DogMessage(TypedDict):
+    message: str
+    status: str
+
+
+class HighwayList(TypedDict):
+    entries: list[str]
+
+
+class Coordinate(TypedDict):
+    lat: str
+    long: str
+
+
+class TruckPark(TypedDict):
+    id: str
+    title: str
+    subtitle: str
+    # missing for some truck parks
+    description: NotRequired[list[str]]
+    coordinate: Coordinate
+    features: NotRequired[list[str]]
+
+
+class TruckParkList(TypedDict):
+    entries: list[TruckPark]
+
+
+CryptoTicks = list[CryptoTick]
@@ -0,0 +1,188 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from model import ApiVisualize
+from queries import TickQuery
+from memo import content_digest
+from http_client import ApiRequestError
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    """Pre-rendered visualization, ready to be sent to any number of viewers."""
+    body: bytes
+    gzip_body: bytes
+    content_type: str
+    etag: str
+
+
+class RenderCache:
+    """
+    In-memory cache of the rendered output of one visualization class.
+    Only one thread refreshes at a time; concurrent viewers wait for its result instead of requesting upstream themselves.
+    A failed refresh is only retried after retry_interval seconds; meanwhile the last page, or the error, is served.
+    """
+    retry_interval: float = 10.0
+
+    def __init__(self, visualization_class: type[ApiVisualize]):
+        self.visualization_object = visualization_class()
+        self.visualization_object.headless = True
+        self.lock = threading.Lock()
+        self.page: RenderedPage | None = None
+        self.digest: str | None = None
+        self.refreshed_at: float = float("-inf")
+        # error of the last failed refresh, and when to try again
+        self.error: Exception | None = None
+        self.retry_at: float = float("-inf")
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.refreshed_at < self.visualization_object.refresh_interval
+
+    def is_due(self) -> bool:
+        return (self.page is None or not self.is_fresh()) and time.monotonic() >= self.retry_at
+
+    def get(self) -> RenderedPage:
+        if self.page is not None and not self.is_due():
+            return self.page
+        with self.lock:
+            # viewers queued behind a failed refresh do not call upstream again
+            if self.is_due():
+                try:
+                    self.refresh()
+                    self.error = None
+                except Exception as e:
+                    self.error = e
+                    self.retry_at = time.monotonic() + self.retry_interval
+            # keep serving the last page if the upstream api, processing or rendering fails
+            if self.page is None:
+                raise self.error
+        return self.page
+
+    def refresh(self) -> None:
+        """Request the api again and re-render only if its content changed. Every refresh writes a run report."""
+        visualization_object = self.visualization_object
+        with visualization_object.reported_run() as run:
+            with visualization_object.stage("fetch"):
+                content = visualization_object.api_requests(visualization_object.get_api_url())
+            digest = content_digest(content)
+            if digest != self.digest:
+                self.render(content, digest, run)
+        self.refreshed_at = time.monotonic()
+
+    def render(self, content, digest: str, run) -> None:
+        """Process and render content into a new page; the processed data is recorded in run for its report."""
+        visualization_object = self.visualization_object
+        with visualization_object.stage("process"):
+            run.data = visualization_object.process(content)
+            visualization_object.track_result(run.data)
+        with visualization_object.stage("visualize"):
+            visualization_object.visualize_data(run.data)
+        body, suffix = visualization_object.output
+        self.page = RenderedPage(
+            body=body,
+            gzip_body=gzip.compress(body),
+            content_type=mimetypes.types_map.get(suffix, "application/octet-stream"),
+            etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+        )
+        self.digest = digest
+
+
+class VisualizationHandler(BaseHTTPRequestHandler):
+    """
+    Serve /<name> for every visualization, e.g. /crypto, with ETag and gzip support.
+    With a tick query, also serve the crypto history as json:
+        - /history/price?at=<time>
+        - /history/ohlc?start=<time>&end=<time>
+    """
+    caches: dict[str, RenderCache] = {}
+    query: TickQuery | None = None
+
+    def do_GET(self):
+        name = self.path.strip("/").split("?")[0]
+        if name.startswith("history/") and self.query is not None:
+            self.send_history(name.removeprefix("history/"))
+            return
+        if name == "":
+            links = "".join(f'<li><a href="/{key}">{key}</a></li>' for key in self.caches)
+            self.send_body(f"<html><body><ul>{links}</ul></body></html>".encode(), "text/html")
+            return
+        if name not in self.caches:
+            self.send_error(404)
+            return
+        try:
+            page = self.caches[name].get()
+        except ApiRequestError as e:
+            self.send_error(502, str(e))
+            return
+        except Exception as e:
+            self.send_error(500, f"Rendering {name} failed: {e}")
+            return
+        if page.etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", page.etag)
+            self.end_headers()
+            return
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        self.send_body(
+            page.gzip_body if use_gzip else page.body,
+            page.content_type,
+            {
+                "ETag": page.etag,
+                "Cache-Control": "no-cache",
+                "Vary": "Accept-Encoding",
+                **({"Content-Encoding": "gzip"} if use_gzip else {}),
+            },
+        )
+
+    def send_history(self, name: str):
+        parameters = {key: values[0] for key, values in parse_qs(urlsplit(self.path).query).items()}
+        try:
+            if name == "price":
+                result = {"time": parameters["at"], "price": self.query.price_at(parameters["at"])}
+            elif name == "ohlc":
+                result = {"start": parameters["start"], "end": parameters["end"], **asdict(self.query.ohlc(parameters["start"], parameters["end"]))}
+            else:
+                self.send_error(404)
+                return
+        except KeyError as e:
+            # a missing parameter, or no ticks in the requested time
+            self.send_error(404, str(e))
+            return
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        self.send_body(json.dumps(result).encode(), "application/json")
+
+    def send_body(self, body: bytes, content_type: str, headers: dict | None = None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(visualization_classes: list[type[ApiVisualize]], port: int, query: TickQuery | None = None) -> ThreadingHTTPServer:
+    handler = type(
+        "Handler",
+        (VisualizationHandler,),
+        {"caches": {cls.output_name(): RenderCache(cls) for cls in visualization_classes}, "query": query},
+    )
+    return ThreadingHTTPServer(("", port), handler)
+
+
+def run_server(visualization_classes: list[type[ApiVisualize]], port: int, query: TickQuery | None = None) -> None:
+    """Serve the visualizations, and the history queries if given, until interrupted."""
+    server = make_server(visualization_classes, port, query)
+    print(f"Serving {', '.join(server.RequestHandlerClass.caches)} at http://localhost:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+import pandas as pd
+from memo import HAS_PYARROW
+from arrow_io import read_ipc, write_ipc
+from shared_results import SharedResult, share
+
+
+@dataclass
+class ProcessedHighway:
+    """Truck parks of one highway processed by a shard worker, in an Arrow IPC file or shared memory block until loaded."""
+    path: str | None = None
+    shared: SharedResult | None = None
+
+    def load(self) -> pd.DataFrame:
+        if self.path is not None:
+            return read_ipc(self.path, arrow_backed=False)
+        return self.shared.load()
+
+
+def process_shard(visualization_class: type, highways: list[list[dict]], directory: str | None, shard: int) -> list[ProcessedHighway]:
+    """
+    Worker: process the truck parks of some highways.
+    The processed frames are handed back as Arrow IPC files in directory, or in shared memory without directory.
+    """
+    visualization_object = visualization_class()
+    processed = []
+    for number, truck_parks in enumerate(highways):
+        frame = visualization_object.process_highway(truck_parks)
+        if directory is None:
+            processed.append(ProcessedHighway(shared=share(frame)))
+            continue
+        path = os.path.join(directory, f"{shard}-{number}.arrow")
+        write_ipc(frame, path)
+        processed.append(ProcessedHighway(path=path))
+    return processed
+
+
+class ShardPool:
+    """
+    Persistent pool of worker processes, which process the highways of AutobahnVisualize in shards.
+    The highways are fetched by the calling process, which shares one rate limiter and response cache for all requests;
+    every worker parses a contiguous part of them, so the CPU-bound processing scales across cores.
+    Results are merged through memory-mapped Arrow IPC files with pyarrow installed, otherwise through shared memory,
+    instead of pickled data frames.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+
+    def process_highways(self, visualization_class: type, highways: list[list[dict]]) -> list[pd.DataFrame]:
+        """Process the truck parks of all highways with visualization_class.process_highway, in their original order."""
+        if not highways:
+            return []
+        shard_size = -(-len(highways) // self.workers)
+        shards = [highways[start:start + shard_size] for start in range(0, len(highways), shard_size)]
+        with tempfile.TemporaryDirectory(prefix="shards-") if HAS_PYARROW else nullcontext() as directory:
+            futures = [
+                self.executor.submit(process_shard, visualization_class, shard, directory, number)
+                for number, shard in enumerate(shards)
+            ]
+            # load the frames before the temporary directory is removed
+            return [processed.load() for future in futures for processed in future.result()]
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
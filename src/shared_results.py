@@ -0,0 +1,141 @@
+import pickle
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+
+# offset alignment of the column blocks
+ALIGNMENT = 64
+
+# released blocks whose mapping could not be closed yet, because views of them were still alive
+_unclosed_blocks: list[SharedMemory] = []
+
+
+@dataclass
+class SharedColumn:
+    """Position of one data frame column in the shared memory block."""
+    name: object
+    # "array": raw NumPy values, "categorical": codes, "pickled": pickled values (object and extension dtypes)
+    kind: str
+    offset: int
+    nbytes: int
+    dtype: str | None = None
+    categories: pd.Index | None = None
+    ordered: bool = False
+
+
+@dataclass
+class SharedResult:
+    """
+    Handle of a processed result (data frame or bytes) in a shared memory block.
+    The handle is small to pickle; the block is written once by the producing process and mapped by the consumer:
+        - attach() maps the block and returns the result, whose NumPy columns and bytes are views into the block
+        - release() unmaps and frees the block; views returned by attach() must not be used afterwards
+        - load() returns a copy of the result and releases the block at once
+    Every result has to be released exactly once, otherwise the block is only freed at interpreter exit.
+    """
+    name: str
+    size: int
+    # "frame" or "bytes"
+    kind: str
+    columns: list[SharedColumn] = field(default_factory=list)
+    index: pd.Index | None = None
+    block: SharedMemory | None = field(default=None, repr=False)
+
+    def __getstate__(self):
+        return {**self.__dict__, "block": None}
+
+    def attach(self):
+        if self.block is None:
+            self.block = SharedMemory(name=self.name)
+        if self.kind == "bytes":
+            return self.block.buf[:self.size]
+        values = []
+        for column in self.columns:
+            buffer = self.block.buf[column.offset:column.offset + column.nbytes]
+            if column.kind == "array":
+                values.append(np.frombuffer(buffer, dtype=column.dtype))
+            elif column.kind == "categorical":
+                codes = np.frombuffer(buffer, dtype=column.dtype)
+                values.append(pd.Categorical.from_codes(codes, column.categories, column.ordered, validate=False))
+            else:
+                values.append(pickle.loads(buffer))
+        data = pd.DataFrame(dict(enumerate(values)), index=self.index, copy=False)
+        data.columns = [column.name for column in self.columns]
+        return data
+
+    def load(self):
+        data = self.attach()
+        data = bytes(data) if self.kind == "bytes" else data.copy(deep=True)
+        self.release()
+        return data
+
+    def release(self) -> None:
+        if self.block is None:
+            self.block = SharedMemory(name=self.name)
+        self.block.unlink()
+        _unclosed_blocks.append(self.block)
+        self.block = None
+        close_released_blocks()
+
+    def __enter__(self):
+        return self.attach()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def close_released_blocks() -> None:
+    """Close the mappings of released blocks, as soon as no views of them are alive any more."""
+    for block in list(_unclosed_blocks):
+        try:
+            block.close()
+        except BufferError:
+            continue
+        _unclosed_blocks.remove(block)
+
+
+def can_share(data) -> bool:
+    return isinstance(data, (pd.DataFrame, bytes))
+
+
+def share(data) -> SharedResult:
+    """
+    Copy a data frame or bytes into a new shared memory block and return its handle.
+    Columns with NumPy dtypes and the codes of categoricals are stored as raw blocks; other columns are pickled into it.
+    """
+    if isinstance(data, bytes):
+        block = SharedMemory(create=True, size=max(len(data), 1))
+        block.buf[:len(data)] = data
+        result = SharedResult(block.name, len(data), "bytes")
+        block.close()
+        return result
+    if not isinstance(data, pd.DataFrame):
+        raise TypeError(f"Only data frames and bytes can be shared, not {type(data).__name__}")
+    columns = []
+    buffers = []
+    offset = 0
+    for position, name in enumerate(data.columns):
+        series = data.iloc[:, position]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = np.ascontiguousarray(series.cat.codes.to_numpy())
+            column = SharedColumn(name, "categorical", offset, codes.nbytes, codes.dtype.str, series.cat.categories, series.cat.ordered)
+            buffer = codes
+        elif isinstance(series.dtype, np.dtype) and series.dtype != object:
+            values = np.ascontiguousarray(series.to_numpy())
+            column = SharedColumn(name, "array", offset, values.nbytes, values.dtype.str)
+            buffer = values
+        else:
+            buffer = pickle.dumps(series.array, protocol=pickle.HIGHEST_PROTOCOL)
+            column = SharedColumn(name, "pickled", offset, len(buffer))
+        columns.append(column)
+        buffers.append(buffer)
+        offset += -(-column.nbytes // ALIGNMENT) * ALIGNMENT
+    block = SharedMemory(create=True, size=max(offset, 1))
+    for column, buffer in zip(columns, buffers):
+        if isinstance(buffer, np.ndarray):
+            buffer = buffer.view(np.uint8)
+        block.buf[column.offset:column.offset + column.nbytes] = buffer
+    result = SharedResult(block.name, offset, "frame", columns, data.index)
+    block.close()
+    return result
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km between one point and arrays of points, all in degrees."""
+    lat, lon, lats, lons = np.radians(lat), np.radians(lon), np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class TruckParkIndex:
+    """
+    Spatial index over truck parks for nearest-neighbour and radius queries.
+    Parks are sorted into a regular lat/long grid of cell_size degrees, so a query only computes
+    haversine distances for the parks in the grid cells its search radius touches.
+    Query results are positions (rows) in the processed AutobahnVisualize data frame, ordered by distance.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, lorry_spots: np.ndarray, cell_size: float = 0.5):
+        self.cell_size = cell_size
+        keys = self.cell_keys(lat, lon)
+        order = np.argsort(keys, kind="stable")
+        self.positions = order
+        self.keys = keys[order]
+        self.lat = np.asarray(lat, dtype=np.float64)[order]
+        self.lon = np.asarray(lon, dtype=np.float64)[order]
+        self.lorry_spots = np.asarray(lorry_spots)[order]
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, cell_size: float = 0.5) -> "TruckParkIndex":
+        """Build the index from the output of AutobahnVisualize.process_content."""
+        return cls(
+            df["coordinate.lat"].astype(float).to_numpy(),
+            df["coordinate.long"].astype(float).to_numpy(),
+            df["lorry_spots"].to_numpy(),
+            cell_size,
+        )
+
+    @property
+    def n_rows(self) -> int:
+        return int(np.ceil(180 / self.cell_size)) + 1
+
+    @property
+    def n_cols(self) -> int:
+        return int(np.ceil(360 / self.cell_size))
+
+    def cell_keys(self, lat, lon) -> np.ndarray:
+        rows = np.floor((np.asarray(lat, dtype=np.float64) + 90) / self.cell_size).astype(np.int64)
+        cols = np.floor((np.asarray(lon, dtype=np.float64) + 180) / self.cell_size).astype(np.int64) % self.n_cols
+        return rows * self.n_cols + cols
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Sorted-array indices of all parks in grid cells that can lie within radius_km."""
+        dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+        max_abs_lat = min(abs(lat) + dlat, 90.0)
+        cos_lat = np.cos(np.radians(max_abs_lat))
+        dlon = 180.0 if cos_lat < 1e-9 else min(np.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+        rows = np.arange(
+            max(int(np.floor((lat - dlat + 90) / self.cell_size)), 0),
+            min(int(np.floor((lat + dlat + 90) / self.cell_size)), self.n_rows - 1) + 1,
+        )
+        cols = np.unique(np.arange(
+            int(np.floor((lon - dlon + 180) / self.cell_size)),
+            int(np.floor((lon + dlon + 180) / self.cell_size)) + 1,
+        ) % self.n_cols)
+        if len(rows) * len(cols) > len(self.keys):
+            return np.arange(len(self.keys))
+        wanted = (rows[:, None] * self.n_cols + cols[None, :]).ravel()
+        starts = np.searchsorted(self.keys, wanted, side="left")
+        ends = np.searchsorted(self.keys, wanted, side="right")
+        filled = ends > starts
+        if not filled.any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, end) for start, end in zip(starts[filled], ends[filled])])
+
+    def within(self, lat: float, lon: float, radius_km: float, min_lorry_spots: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        """All parks within radius_km of (lat, lon) with at least min_lorry_spots, as (positions, distances in km)."""
+        candidates = self.candidates(lat, lon, radius_km)
+        candidates = candidates[self.lorry_spots[candidates] >= min_lorry_spots]
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return self.positions[candidates[order]], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int = 1, min_lorry_spots: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        """The k nearest parks to (lat, lon) with at least min_lorry_spots, as (positions, distances in km)."""
+        radius_km = self.cell_size * 111.0
+        while True:
+            positions, distances = self.within(lat, lon, radius_km, min_lorry_spots)
+            if len(positions) >= k or radius_km >= np.pi * EARTH_RADIUS_KM:
+                return positions[:k], distances[:k]
+            radius_km *= 2
+
+    def save(self, path: str) -> None:
+        """Persist the index as an uncompressed .npz file."""
+        np.savez(
+            path,
+            cell_size=np.array(self.cell_size),
+            positions=self.positions,
+            keys=self.keys,
+            lat=self.lat,
+            lon=self.lon,
+            lorry_spots=self.lorry_spots,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TruckParkIndex":
+        """Load an index written by save, without rebuilding it."""
+        index = cls.__new__(cls)
+        with np.load(path) as arrays:
+            index.cell_size = float(arrays["cell_size"])
+            for name in ("positions", "keys", "lat", "lon", "lorry_spots"):
+                setattr(index, name, arrays[name])
+        return index
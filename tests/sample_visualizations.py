@@ -0,0 +1,34 @@
+from io import BytesIO
+from PIL import Image
+from test_sample_data import crypto_sample_data, autobahn_sample_data
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import CryptoVisualize, AutobahnVisualize, DogVisualize
+
+
+def sample_image() -> bytes:
+    image = BytesIO()
+    Image.new("RGB", (64, 48)).save(image, format="PNG")
+    return image.getvalue()
+
+
+class SampleCryptoVisualize(CryptoVisualize):
+    def api_requests(self, api_url):
+        return crypto_sample_data
+
+
+class SampleAutobahnVisualize(AutobahnVisualize):
+    def api_requests(self, api_url):
+        return autobahn_sample_data
+
+
+class SampleDogVisualize(DogVisualize):
+    image = sample_image()
+
+    def api_requests(self, api_url):
+        return {"message": "https://images.dog.ceo/breeds/sample.png", "status": "success"}
+
+    def process_content(self, content):
+        return self.image
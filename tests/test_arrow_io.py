@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from test_sample_data import crypto_sample_data, autobahn_sample_data
+from sample_visualizations import SampleCryptoVisualize
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import ApiVisualize, CryptoVisualize, AutobahnVisualize
+from arrow_io import read_ipc, write_ipc
+from pipeline import Pipeline
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize(
+    "visualization_class,sample_data",
+    [
+        (CryptoVisualize, crypto_sample_data),
+        (AutobahnVisualize, autobahn_sample_data),
+    ],
+)
+def test_arrow_backed_round_trip(tmp_path, visualization_class, sample_data):
+    # Arrange
+    visualization_object = visualization_class()
+    visualization_object.arrow_backed = True
+    # Act
+    data = visualization_object.process_content(sample_data)
+    write_ipc(data, str(tmp_path / "data.arrow"))
+    loaded_data = read_ipc(str(tmp_path / "data.arrow"))
+    # Assert
+    assert all(
+        isinstance(dtype, (pd.ArrowDtype, pd.CategoricalDtype))
+        for dtype in data.dtypes
+    )
+    pd.testing.assert_frame_equal(loaded_data, data)
+
+
+@pytest.mark.parametrize(
+    "visualization_class,sample_data",
+    [
+        (CryptoVisualize, crypto_sample_data),
+        (AutobahnVisualize, autobahn_sample_data),
+    ],
+)
+def test_backends_have_the_same_dtypes(visualization_class, sample_data):
+    # Arrange
+    numpy_object = visualization_class()
+    arrow_object = visualization_class()
+    arrow_object.arrow_backed = True
+    # Act
+    numpy_data = numpy_object.process_content(sample_data)
+    arrow_data = arrow_object.process_content(sample_data)
+    # Assert
+    def numpy_dtype(dtype):
+        if not isinstance(dtype, pd.ArrowDtype):
+            return dtype
+        # strings are kept as python objects by the NumPy backend
+        return np.dtype(object) if pa.types.is_string(dtype.pyarrow_dtype) else dtype.numpy_dtype
+    assert [numpy_dtype(dtype) for dtype in arrow_data.dtypes] == list(numpy_data.dtypes)
+
+
+class DtypeRecordingVisualize(SampleCryptoVisualize):
+    def print_report(self, data):
+        self.price_dtype = data["price"].dtype
+
+
+def test_pipeline_workers_use_the_arrow_backend():
+    # Arrange
+    job = DtypeRecordingVisualize()
+    job.headless = True
+    ApiVisualize.arrow_backed = True
+    # Act
+    try:
+        [(_, error)] = Pipeline().run([job])
+    finally:
+        ApiVisualize.arrow_backed = False
+    # Assert
+    assert error is None
+    assert job.price_dtype == pd.ArrowDtype(pa.float64())
@@ -0,0 +1,117 @@
+import copy
+import numpy as np
+from test_sample_data import autobahn_sample_data
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import AutobahnVisualize
+from memo import ProcessCache
+
+
+def process_and_track(visualization_object, content):
+    data = visualization_object.process(content)
+    visualization_object.track_result(data)
+    return data
+
+
+def test_description_and_features_are_parsed():
+    # Arrange
+    visualization_object = AutobahnVisualize()
+    # Act
+    data = visualization_object.process_content(autobahn_sample_data)
+    with_restaurant_and_fuel = data[visualization_object.has_features(data, "restaurant", "fuel") & (data["lorry_spots"] >= 20)]
+    # Assert
+    assert data["car_spots"].dtype == np.int16
+    assert data["lorry_spots"].dtype == np.int16
+    assert data["features_mask"].dtype == np.uint32
+    assert data["Autobahn"].dtype == "category"
+    assert data["city"].dtype == "category"
+    assert list(data.loc[0, ["Autobahn", "city"]]) == ["A1", "Puttgarden"]
+    assert list(data.loc[0, ["car_spots", "lorry_spots"]]) == [42, 36]
+    assert data.loc[4, "features_mask"] == 0
+    assert "Hochwald Ost" in set(with_restaurant_and_fuel["subtitle"])
+    assert "Mehringer Höhe" not in set(with_restaurant_and_fuel["subtitle"])
+
+
+def test_truck_parks_without_description_and_features():
+    # Arrange
+    visualization_object = AutobahnVisualize()
+    content = copy.deepcopy(autobahn_sample_data)
+    del content[0][0]["description"]
+    del content[0][1]["features"]
+    # Act
+    data = visualization_object.process_content(content)
+    # Assert
+    assert data.loc[0, ["car_spots", "lorry_spots"]].tolist() == [0, 0]
+    assert data.loc[1, "features_mask"] == 0
+    assert len(data) == sum(len(highway) for highway in autobahn_sample_data)
+
+
+def test_changes_between_runs():
+    # Arrange
+    visualization_object = AutobahnVisualize()
+    changed_content = copy.deepcopy(autobahn_sample_data)
+    changed_content[0][0]["description"][1] = "LKW Stellplätze: 40"
+    removed_park = changed_content[1].pop()
+    # Act
+    process_and_track(visualization_object, autobahn_sample_data)
+    first_changes = visualization_object.changes
+    data = process_and_track(visualization_object, changed_content)
+    # Assert
+    assert first_changes is None
+    assert visualization_object.changes == {
+        "added": [],
+        "removed": [removed_park["id"]],
+        "changed": [autobahn_sample_data[0][0]["id"]],
+        "reprocessed_highways": 2,
+    }
+    assert data.loc[data["id"] == autobahn_sample_data[0][0]["id"], "lorry_spots"].item() == 40
+
+
+def test_changes_with_cached_results():
+    # Arrange
+    visualization_object = AutobahnVisualize()
+    visualization_object.process_cache = ProcessCache()
+    changed_content = copy.deepcopy(autobahn_sample_data)
+    removed_park = changed_content[1].pop()
+    process_and_track(visualization_object, autobahn_sample_data)
+    process_and_track(visualization_object, changed_content)
+    # Act
+    process_and_track(visualization_object, autobahn_sample_data)
+    # Assert
+    assert visualization_object.changes == {
+        "added": [removed_park["id"]],
+        "removed": [],
+        "changed": [],
+        "reprocessed_highways": 1,
+    }
+
+
+def test_high_volume_map_is_decimated_and_clustered():
+    # Arrange
+    visualization_object = AutobahnVisualize()
+    visualization_object.headless = True
+    visualization_object.high_volume_threshold = 100
+    visualization_object.max_map_points = 300
+    data = visualization_object.process_content(autobahn_sample_data)
+    # Act
+    decimated_data = visualization_object.decimate(data, 300)
+    visualization_object.visualize_data(data)
+    body, suffix = visualization_object.output
+    # Assert
+    assert len(decimated_data) <= 300
+    assert set(decimated_data["Autobahn"]) == set(data["Autobahn"])
+    assert suffix == ".html"
+    assert b'"type":"scattermap"' in body
+    assert b'"cluster":{"enabled":true' in body
+
+
+def test_decimate_with_fewer_points_than_autobahns():
+    # Arrange
+    visualization_object = AutobahnVisualize()
+    data = visualization_object.process_content(autobahn_sample_data)
+    # Act
+    decimated_data = visualization_object.decimate(data, 1)
+    # Assert
+    assert len(decimated_data) == 1
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import CryptoVisualize
+
+
+def test_downsample_keeps_extremes():
+    # Arrange
+    visualization_object = CryptoVisualize()
+    price = np.sin(np.linspace(0, 20, 100_000)) * 1000 + 50_000
+    price[12_345] = 99_999
+    data = pd.DataFrame({"time": np.arange(len(price)), "price": price})
+    # Act
+    downsampled = visualization_object.downsample(data, "price", 4000)
+    # Assert
+    assert len(downsampled) <= 4000
+    assert downsampled["time"].is_monotonic_increasing
+    assert downsampled["price"].max() == 99_999
+    assert downsampled["price"].min() == data["price"].min()
+
+
+def test_extract_columns_nested_keys_and_defaults():
+    # Arrange
+    visualization_object = CryptoVisualize()
+    records = [
+        {"id": "a", "coordinate": {"lat": "1.5"}, "features": ["wc"], "price": 1},
+        {"id": "b", "coordinate": {"lat": "2.5"}, "features": []},
+    ]
+    # Act
+    columns = visualization_object.extract_columns(
+        records,
+        {"id": object, "coordinate.lat": object, "features": object, "price": np.float64},
+        defaults={"price": np.nan},
+    )
+    # Assert
+    assert list(columns["id"]) == ["a", "b"]
+    assert list(columns["coordinate.lat"]) == ["1.5", "2.5"]
+    assert columns["features"].shape == (2,) and columns["features"][0] == ["wc"]
+    assert columns["price"].dtype == np.float64 and columns["price"][0] == 1 and np.isnan(columns["price"][1])
+    with pytest.raises(KeyError, match="Record 1 has no value for price"):
+        visualization_object.extract_columns(records, {"price": np.float64})
+
+
+def test_downsample_ignores_missing_values():
+    # Arrange
+    visualization_object = CryptoVisualize()
+    price = np.arange(1000, dtype=np.float64)
+    price[::7] = np.nan
+    price[500:510] = np.nan
+    data = pd.DataFrame({"time": np.arange(len(price)), "price": price})
+    # Act
+    downsampled = visualization_object.downsample(data, "price", 200)
+    # Assert
+    # one min and max per bucket, except for the bucket without any price
+    assert len(downsampled) == 198
+    assert not downsampled["price"].isna().any()
+    assert downsampled["price"].max() == np.nanmax(price)
@@ -0,0 +1,56 @@
+import sched
+import requests
+from sample_visualizations import SampleCryptoVisualize
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import CryptoVisualize
+from daemon import refresh
+from http_client import HttpClient
+
+
+class FakeVisualize(SampleCryptoVisualize):
+    refresh_interval = 5
+
+
+def test_refresh_writes_output_and_reschedules(tmp_path):
+    # Arrange
+    scheduler = sched.scheduler()
+    visualization_object = FakeVisualize()
+    visualization_object.output_dir = str(tmp_path)
+    # Act
+    refresh(scheduler, visualization_object)
+    # Assert
+    assert (tmp_path / "fake.html").read_text().startswith("<html>")
+    assert len(scheduler.queue) == 1
+    assert scheduler.queue[0].argument == (scheduler, visualization_object)
+    assert not [path for path in tmp_path.iterdir() if path.name.startswith(".tmp-")]
+
+
+class OfflineVisualize(CryptoVisualize):
+    refresh_interval = 5
+
+
+class BrokenVisualize(FakeVisualize):
+    def process_content(self, content):
+        raise RuntimeError("unexpected content")
+
+
+class OfflineSession:
+    def get(self, url, headers, timeout):
+        raise requests.ConnectionError("network is unreachable")
+
+
+def test_failing_runs_are_rescheduled(monkeypatch, tmp_path):
+    # Arrange
+    scheduler = sched.scheduler()
+    monkeypatch.setattr(OfflineVisualize, "client", HttpClient())
+    OfflineVisualize.client.session = OfflineSession()
+    visualization_objects = [OfflineVisualize(), BrokenVisualize()]
+    # Act
+    for visualization_object in visualization_objects:
+        visualization_object.output_dir = str(tmp_path)
+        refresh(scheduler, visualization_object)
+    # Assert
+    assert [event.argument[1] for event in scheduler.queue] == visualization_objects
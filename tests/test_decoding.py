@@ -0,0 +1,83 @@
+import json
+import pytest
+from test_sample_data import crypto_sample_data, autobahn_sample_data
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from decoding import DECODERS, DecodeError, ValidationError
+from schemas import CryptoTicks, TruckParkList
+
+
+@pytest.mark.parametrize("decoder", list(DECODERS))
+@pytest.mark.parametrize(
+    "content,response_type",
+    [
+        (crypto_sample_data, CryptoTicks),
+        ({"entries": autobahn_sample_data[0]}, TruckParkList),
+    ],
+)
+def test_decoders_agree(decoder, content, response_type):
+    # Arrange
+    data = json.dumps(content).encode()
+    # Act
+    decoded = DECODERS[decoder](data, response_type)
+    # Assert
+    assert decoded == content
+
+
+@pytest.mark.parametrize("decoder", list(DECODERS))
+def test_unknown_fields_are_dropped(decoder):
+    # Arrange
+    truck_park = {**autobahn_sample_data[0][0], "isBlocked": "false", "coordinate": {"lat": "49.6", "long": "6.8", "srid": 4326}}
+    data = json.dumps({"entries": [truck_park], "total": 1}).encode()
+    # Act
+    decoded = DECODERS[decoder](data, TruckParkList)
+    # Assert
+    assert decoded == {"entries": [{**autobahn_sample_data[0][0], "coordinate": {"lat": "49.6", "long": "6.8"}}]}
+
+
+@pytest.mark.parametrize("decoder", list(DECODERS))
+@pytest.mark.parametrize(
+    "content,response_type,message",
+    [
+        ([{"timestamp": "2024-07-01T00:00:00Z"}], CryptoTicks, "Object missing required field `price` - at `$[0]`"),
+        ([{"timestamp": "2024-07-01T00:00:00Z", "price": "1"}], CryptoTicks, "Expected `float`, got `str` - at `$[0].price`"),
+        (
+            {"entries": [{**autobahn_sample_data[0][0], "coordinate": {"lat": 49.6, "long": "6.8"}}]},
+            TruckParkList,
+            "Expected `str`, got `float` - at `$.entries[0].coordinate.lat`",
+        ),
+        (
+            {"entries": [autobahn_sample_data[0][0], {**autobahn_sample_data[0][1], "features": ["WLAN", "WLAN", 3]}]},
+            TruckParkList,
+            "Expected `str`, got `int` - at `$.entries[1].features[2]`",
+        ),
+    ],
+)
+def test_invalid_content_is_reported_with_path(decoder, content, response_type, message):
+    # Arrange
+    data = json.dumps(content).encode()
+    # Act
+    with pytest.raises(ValidationError) as error:
+        DECODERS[decoder](data, response_type)
+    # Assert
+    assert str(error.value) == message
+
+
+@pytest.mark.parametrize("decoder", list(DECODERS))
+def test_invalid_json_raises_decode_error(decoder):
+    # Act
+    with pytest.raises(DecodeError):
+        DECODERS[decoder](b'{"entries": [', TruckParkList)
+
+
+@pytest.mark.parametrize("decoder", list(DECODERS))
+def test_optional_truck_park_fields(decoder):
+    # Arrange
+    truck_park = {key: value for key, value in autobahn_sample_data[0][0].items() if key not in ("description", "features")}
+    data = json.dumps({"entries": [truck_park]}).encode()
+    # Act
+    decoded = DECODERS[decoder](data, TruckParkList)
+    # Assert
+    assert decoded == {"entries": [truck_park]}
@@ -0,0 +1,77 @@
+import base64
+import json
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from test_sample_data import crypto_sample_data
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import CryptoVisualize
+from export import compact_figure_json, figures_to_html, write_bundle, write_plotlyjs, PLOTLYJS_FILENAME
+
+
+def test_compact_figure_json_uses_typed_arrays():
+    # Arrange
+    fig = px.line(x=np.arange(1000), y=np.random.rand(1000))
+    # Act
+    compact_json = compact_figure_json(fig)
+    trace = json.loads(compact_json)["data"][0]
+    # Assert
+    assert len(compact_json) < len(fig.to_json())
+    assert trace["y"]["dtype"] == "f8"
+    assert np.array_equal(
+        np.frombuffer(base64.b64decode(trace["y"]["bdata"]), dtype="<f8"),
+        fig.data[0].y,
+    )
+
+
+def test_bundle_shares_plotlyjs(tmp_path):
+    # Arrange
+    visualization_object = CryptoVisualize()
+    visualization_object.headless = True
+    visualization_object.visualize_data(visualization_object.process_content(crypto_sample_data))
+    # Act
+    write_bundle([visualization_object.figure] * 3, tmp_path / "report.html")
+    page = (tmp_path / "report.html").read_text()
+    # Assert
+    assert (tmp_path / PLOTLYJS_FILENAME).exists()
+    assert page.count("<script src=") == 1
+    assert page.count("Plotly.newPlot(") == 3
+    assert len(page) < 100_000
+
+
+def test_only_data_arrays_are_encoded():
+    # Arrange
+    pie = go.Pie(values=[1, 2, 3], domain={"x": [0, 0.5], "y": [0, 1]})
+    heatmap = go.Heatmap(z=np.arange(6, dtype=np.float64).reshape(2, 3))
+    fig = go.Figure([pie, heatmap])
+    # Act
+    traces = json.loads(compact_figure_json(fig))["data"]
+    # Assert
+    assert traces[0]["domain"] == {"x": [0, 0.5], "y": [0, 1]}
+    assert traces[0]["values"]["dtype"] == "i4"
+    assert traces[1]["z"]["shape"] == "2,3"
+    assert np.array_equal(np.frombuffer(base64.b64decode(traces[1]["z"]["bdata"]), dtype="<f8"), np.arange(6))
+
+
+def test_stale_plotlyjs_is_replaced(tmp_path):
+    # Arrange
+    (tmp_path / PLOTLYJS_FILENAME).write_text("/* plotly.js of an older version */")
+    # Act
+    write_plotlyjs(str(tmp_path))
+    # Assert
+    assert (tmp_path / PLOTLYJS_FILENAME).stat().st_size > 1_000_000
+
+
+def test_api_strings_cannot_close_the_script():
+    # Arrange
+    subtitle = "</script><script>alert(1)</script>"
+    fig = go.Figure(go.Scatter(x=[1], y=[2], hovertext=[subtitle], name=subtitle))
+    # Act
+    html = figures_to_html([fig])
+    # Assert
+    assert subtitle not in html
+    assert html.count("</script>") == 2
+    assert json.loads(compact_figure_json(fig))["data"][0]["hovertext"] == [subtitle]
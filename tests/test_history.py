@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from test_sample_data import crypto_sample_data
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import CryptoVisualize
+from history import CryptoHistory
+
+
+def test_append_and_range(tmp_path):
+    # Arrange
+    data = CryptoVisualize().process_content(crypto_sample_data)
+    history = CryptoHistory(str(tmp_path), initial_capacity=4)
+    # Act
+    appended = history.append(data.iloc[:10])
+    # overlapping rows are skipped, and the files grow beyond the initial capacity
+    appended_again = history.append(data)
+    window = CryptoHistory(str(tmp_path)).range("2024-07-03", "2024-07-06")
+    # Assert
+    assert appended == 10
+    assert appended_again == len(data) - 10
+    assert len(history) == len(data) and history.capacity >= len(data)
+    assert list(window["time"]) == list(pd.date_range("2024-07-03", "2024-07-05"))
+    assert np.array_equal(window["price"].to_numpy(), data["price"].to_numpy()[2:5])
+    assert not window["price"].to_numpy().flags.owndata
+    assert len(history.range("2030-01-01")) == 0
@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from http_client import HttpClient, SingleFlight, TokenBucket, parse_retry_after
+
+
+def test_single_flight_shares_result():
+    # Arrange
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        release.wait()
+        return "content"
+
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("url", fetch)))
+        for _ in range(5)
+    ]
+    # Act
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    # Assert
+    assert len(calls) == 1
+    assert results == ["content"] * 5
+    assert flight.calls == {}
+
+
+def test_token_bucket_limits_and_backs_off():
+    # Arrange
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    # Act
+    burst_delays = [bucket.reserve(), bucket.reserve()]
+    limited_delay = bucket.reserve()
+    now[0] = 10.0
+    bucket.penalize(retry_after=30)
+    throttled_delay = bucket.reserve()
+    # Assert
+    assert burst_delays == [0.0, 0.0]
+    assert limited_delay == 0.5
+    assert throttled_delay == 30.0
+    assert bucket.rate == 1
+    assert bucket.wait_seconds == 30.5
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.status_code = 200
+        self.headers = {}
+        self.content = json.dumps(content).encode()
+
+
+class FakeSession:
+    def __init__(self):
+        self.version = 0
+        self.release = threading.Event()
+
+    def get(self, url, headers, timeout):
+        self.timeout = timeout
+        if self.version > 0:
+            self.release.wait()
+        self.version += 1
+        return FakeResponse({"version": self.version})
+
+
+def test_stale_while_revalidate():
+    # Arrange
+    client = HttpClient()
+    client.session = FakeSession()
+    url = "https://api.coinpaprika.com/v1/tickers"
+    # Act
+    first = client.get_json(url)
+    stale = client.get_json(url, stale_while_revalidate=60)
+    client.session.release.set()
+    while client.revalidating:
+        time.sleep(0.01)
+    refreshed = client.get_json(url, stale_while_revalidate=60)
+    # Assert
+    assert first == {"version": 1}
+    assert stale == {"version": 1}
+    assert refreshed == {"version": 2}
+    # every returned response counts towards the payload of the calling thread, also the cached ones
+    assert client.payload_bytes() == 3 * len(b'{"version": 1}')
+
+
+def test_retry_after_is_capped():
+    # Act
+    waits = [parse_retry_after(value, maximum=60) for value in ["5", "-3", "99999999", "inf", "nan", "Wed, 21 Oct 2099 07:28:00 GMT", "soon", None]]
+    # Assert
+    assert waits == [5, 0, 60, 60, 1, 60, 1, 1]
+
+
+def test_cache_evicts_least_recently_used():
+    # Arrange
+    client = HttpClient()
+    client.session = FakeSession()
+    client.session.release.set()
+    client.max_cache_entries = 2
+    urls = [f"https://api.coinpaprika.com/v1/tickers/{coin}" for coin in ["btc", "eth", "xrp"]]
+    # Act
+    client.get_json(urls[0])
+    client.get_json(urls[1])
+    client.get_json(urls[0], max_age=60)
+    client.get_json(urls[2])
+    # Assert
+    assert [url for _, url in client.cache] == [urls[0], urls[2]]
+
+
+def test_requests_have_a_timeout():
+    # Arrange
+    client = HttpClient()
+    client.session = FakeSession()
+    client.timeout = (1.0, 2.0)
+    # Act
+    client.get_json("https://api.coinpaprika.com/v1/tickers")
+    # Assert
+    assert client.session.timeout == (1.0, 2.0)
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+from test_sample_data import crypto_sample_data
+from sample_visualizations import SampleCryptoVisualize
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import ApiVisualize, CryptoVisualize
+from memo import ProcessCache
+from pipeline import Pipeline
+
+
+class CountingVisualize(CryptoVisualize):
+    calls = 0
+
+    def process_content(self, content):
+        CountingVisualize.calls += 1
+        return super().process_content(content)
+
+
+def test_process_content_is_memoized():
+    # Arrange
+    visualization_object = CountingVisualize()
+    visualization_object.process_cache = ProcessCache()
+    # Act
+    first = visualization_object.process(crypto_sample_data)
+    first["price"] = 0
+    second = visualization_object.process(crypto_sample_data)
+    # Assert
+    assert CountingVisualize.calls == 1
+    assert second["price"].iloc[0] == crypto_sample_data[0]["price"]
+
+
+def test_lru_eviction_and_persistence(tmp_path):
+    # Arrange
+    pytest.importorskip("pyarrow")
+    cache = ProcessCache(max_entries=2, directory=str(tmp_path))
+    frame = pd.DataFrame({"price": [1.0, 2.0]})
+    # Act
+    cache.get_or_compute("crypto", [1], lambda content: frame)
+    cache.get_or_compute("dog", [2], lambda content: b"image")
+    cache.get_or_compute("dog", [3], lambda content: b"other image")
+    reloaded_cache = ProcessCache(max_entries=2, directory=str(tmp_path))
+    # Assert
+    assert len(list(tmp_path.iterdir())) == 2
+    assert reloaded_cache.get_or_compute("dog", [2], lambda content: None) == b"image"
+    assert reloaded_cache.get_or_compute("crypto", [1], lambda content: "recomputed") == "recomputed"
+
+
+def test_pipeline_workers_use_the_process_cache(tmp_path):
+    # Arrange
+    pytest.importorskip("pyarrow")
+    job = SampleCryptoVisualize()
+    job.headless = True
+    ApiVisualize.process_cache = ProcessCache(directory=str(tmp_path))
+    # Act
+    try:
+        [(_, error)] = Pipeline().run([job])
+    finally:
+        ApiVisualize.process_cache = None
+    # Assert
+    assert error is None
+    assert [path.suffix for path in tmp_path.iterdir()] == [".parquet"]
@@ -0,0 +1,79 @@
+import pickle
+import os
+from concurrent.futures.process import BrokenProcessPool
+from test_sample_data import crypto_sample_data
+from sample_visualizations import SampleCryptoVisualize, SampleAutobahnVisualize
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import CryptoVisualize
+from http_client import ApiRequestError
+from pipeline import Pipeline, process_job
+
+
+class FailingVisualize(CryptoVisualize):
+    def api_requests(self, api_url):
+        raise ApiRequestError("upstream down")
+
+
+def test_pipeline_runs_all_jobs():
+    # Arrange
+    jobs = [SampleCryptoVisualize(), SampleAutobahnVisualize(), FailingVisualize(), SampleCryptoVisualize()]
+    for job in jobs:
+        job.headless = True
+    # Act
+    results = Pipeline(fetch_workers=2, queue_size=2).run(jobs)
+    # Assert
+    assert len(results) == 4
+    errors = [error for _, error in results if error is not None]
+    assert len(errors) == 1 and isinstance(errors[0], ApiRequestError)
+    outputs = [job.output for job, error in results if error is None]
+    assert all(suffix == ".html" for _, suffix in outputs)
+
+
+class DyingVisualize(CryptoVisualize):
+    def api_requests(self, api_url):
+        return crypto_sample_data
+
+    def process_content(self, content):
+        os._exit(1)
+
+
+def test_dead_worker_fails_its_jobs_only():
+    # Arrange
+    jobs = [DyingVisualize(), SampleCryptoVisualize(), SampleCryptoVisualize()]
+    for job in jobs:
+        job.headless = True
+    # Act
+    results = Pipeline(fetch_workers=1, queue_size=1).run(jobs)
+    # Assert
+    assert len(results) == 3
+    assert {id(job) for job, _ in results} == {id(job) for job in jobs}
+    assert isinstance(dict((id(job), error) for job, error in results)[id(jobs[0])], BrokenProcessPool)
+
+
+def test_pipeline_returns_the_given_objects_with_their_state():
+    # Arrange
+    job = SampleAutobahnVisualize()
+    job.headless = True
+    # Act
+    [(result, error)] = Pipeline().run([job])
+    # Assert
+    assert error is None
+    assert result is job
+    assert job.park_hashes is not None and job.output is not None
+    assert job.stage_seconds.keys() == {"fetch", "process", "report", "visualize"}
+
+
+def test_only_the_worker_state_is_handed_back():
+    # Arrange
+    job = SampleAutobahnVisualize()
+    content = job.api_requests(job.get_api_url())
+    job.start_run()
+    # Act
+    state, data = process_job(job, content, share_result=True)
+    data.release()
+    # Assert
+    assert state.keys() == {"stage_seconds", "payload_bytes", "content_digests"}
+    assert len(pickle.dumps(state)) < 2000
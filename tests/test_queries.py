@@ -0,0 +1,75 @@
+import threading
+import numpy as np
+import pandas as pd
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from history import CryptoHistory
+from queries import TickQuery
+
+
+def make_ticks(start: str, periods: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "time": pd.date_range(start, periods=periods, freq="7min"),
+        "price": 60_000 + rng.normal(0, 100, periods).cumsum(),
+    })
+
+
+def test_queries_match_raw_ticks(tmp_path):
+    # Arrange
+    ticks = make_ticks("2024-07-01", 3000)
+    history = CryptoHistory(str(tmp_path))
+    history.append(ticks.iloc[:1000])
+    query = TickQuery(history)
+    # Act
+    # the bars are updated incrementally, continuing the last bar of the first part
+    history.append(ticks.iloc[1000:])
+    ohlc = query.ohlc("2024-07-01 05:03", "2024-07-12 17:30")
+    price = query.price_at("2024-07-02 00:05")
+    daily = query.bars("day")
+    # Assert
+    window = ticks[(ticks["time"] >= "2024-07-01 05:03") & (ticks["time"] < "2024-07-12 17:30")]["price"]
+    assert (ohlc.open, ohlc.high, ohlc.low, ohlc.close) == (window.iloc[0], window.max(), window.min(), window.iloc[-1])
+    assert price == ticks[ticks["time"] <= "2024-07-02 00:05"]["price"].iloc[-1]
+    expected_daily = ticks.set_index("time")["price"].resample("D").ohlc()
+    assert np.array_equal(daily["start"], expected_daily.index.to_numpy())
+    assert np.allclose(np.column_stack([daily[column] for column in ["open", "high", "low", "close"]]), expected_daily.to_numpy())
+    assert not query.window("2024-07-02", "2024-07-03")["price"].flags.owndata
+
+
+def test_queries_while_appending(tmp_path):
+    # Arrange
+    ticks = make_ticks("2024-07-01", 4000)
+    history = CryptoHistory(str(tmp_path), initial_capacity=16)
+    history.append(ticks.iloc[:10])
+    query = TickQuery(history)
+    errors = []
+
+    def append_in_chunks():
+        for start in range(10, len(ticks), 10):
+            history.append(ticks.iloc[start:start + 10])
+
+    def query_repeatedly():
+        try:
+            while appender.is_alive():
+                query.ohlc("2024-07-01", "2024-08-01")
+                query.bars("hour")
+        except Exception as e:
+            errors.append(e)
+
+    appender = threading.Thread(target=append_in_chunks)
+    querier = threading.Thread(target=query_repeatedly)
+    # Act
+    appender.start()
+    querier.start()
+    appender.join()
+    querier.join()
+    # new ticks are seen by every query, not only by ohlc
+    hourly = query.bars("hour")
+    # Assert
+    assert errors == []
+    expected_hourly = ticks.set_index("time")["price"].resample("h").ohlc().dropna()
+    assert np.array_equal(hourly["start"], expected_hourly.index.to_numpy())
+    assert np.allclose(np.column_stack([hourly[column] for column in ["open", "high", "low", "close"]]), expected_hourly.to_numpy())
@@ -0,0 +1,24 @@
+import pytest
+from test_sample_data import crypto_sample_data
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import CryptoVisualize
+from rendering import RenderPool
+
+
+def test_render_pool_exports_static_images(tmp_path):
+    # Arrange
+    pytest.importorskip("kaleido")
+    render_pool = RenderPool(workers=2)
+    visualization_object = CryptoVisualize()
+    visualization_object.output_dir = str(tmp_path)
+    visualization_object.render_pool = render_pool
+    # Act
+    visualization_object.visualize_data(visualization_object.process_content(crypto_sample_data))
+    paths = render_pool.wait()
+    render_pool.shutdown()
+    # Assert
+    assert paths == [str(tmp_path / "crypto.png")]
+    assert (tmp_path / "crypto.png").read_bytes().startswith(b"\x89PNG")
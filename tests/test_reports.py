@@ -0,0 +1,123 @@
+import io
+import json
+import pytest
+from test_sample_data import crypto_sample_data, autobahn_sample_data
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import CryptoVisualize, AutobahnVisualize
+from reports import AsyncSink, FileSink, ReportSink, StreamSink
+from pipeline import Pipeline
+from server import RenderCache
+from sample_visualizations import SampleCryptoVisualize, SampleAutobahnVisualize, SampleDogVisualize
+
+
+def test_report_is_rendered_once_per_format(capsys):
+    # Arrange
+    visualization_object = CryptoVisualize()
+    data = visualization_object.process_content(crypto_sample_data)
+    # Act
+    visualization_object.print_report(data)
+    report = visualization_object.build_report(data)
+    # Assert
+    text = capsys.readouterr().out
+    assert text.startswith("-----------------------\nReport for crypto data:\n")
+    assert f"\tMinimum:  {data['price'].min():.2f}\n" in text
+    metrics = json.loads(report.render("json"))["metrics"]
+    assert metrics["Price stats"]["Maximum"] == data["price"].max()
+    assert f"crypto,Price stats.Minimum,{data['price'].min()}" in report.render("csv").splitlines()
+
+
+def test_async_file_sink_writes_json_lines(tmp_path):
+    # Arrange
+    path = tmp_path / "reports.jsonl"
+    crypto_object = CryptoVisualize()
+    autobahn_object = AutobahnVisualize()
+    sink = AsyncSink(FileSink(str(path)))
+    crypto_object.report_sink = sink
+    autobahn_object.report_sink = sink
+    # Act
+    for _ in range(50):
+        crypto_object.print_report(crypto_object.process_content(crypto_sample_data))
+        autobahn_object.print_report(autobahn_object.process_content(autobahn_sample_data))
+    sink.close()
+    # Assert
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 100
+    assert {line["report"] for line in lines} == {"crypto", "autobahn"}
+
+
+def test_stream_sink_writes_whole_reports():
+    # Arrange
+    stream = io.StringIO()
+    visualization_object = AutobahnVisualize()
+    visualization_object.report_sink = StreamSink(stream, "csv")
+    # Act
+    visualization_object.print_report(visualization_object.process_content(autobahn_sample_data))
+    # Assert
+    assert stream.getvalue().startswith("autobahn,Number of truck parks,")
+
+
+def test_run_reports_of_all_classes(capsys):
+    # Arrange
+    stream = io.StringIO()
+    jobs = [SampleCryptoVisualize(), SampleAutobahnVisualize(), SampleDogVisualize()]
+    for job in jobs:
+        job.headless = True
+        job.run_report_sink = StreamSink(stream, "json")
+    # Act
+    for job in jobs:
+        job.show_me_stuff()
+    # Assert
+    reports = {line["report"]: line["metrics"] for line in map(json.loads, stream.getvalue().splitlines())}
+    assert reports["samplecrypto"]["rows"] == len(crypto_sample_data)
+    assert sum(reports["sampleautobahn"]["truck_parks_per_highway"].values()) == reports["sampleautobahn"]["rows"]
+    assert reports["sampledog"]["image_width"] == 64 and reports["sampledog"]["image_height"] == 48
+    assert all(set(metrics["stage_seconds"]) == {"fetch", "process", "report", "visualize"} for metrics in reports.values())
+
+
+class FailingCryptoVisualize(SampleCryptoVisualize):
+    def process_content(self, content):
+        raise ValueError("unexpected content")
+
+
+def test_failed_runs_are_reported(monkeypatch):
+    # Arrange
+    stream = io.StringIO()
+    # sinks are set on the class, like main.py does, since the pipeline sends the job itself to a worker process
+    monkeypatch.setattr(FailingCryptoVisualize, "run_report_sink", StreamSink(stream, "json"))
+    job = FailingCryptoVisualize()
+    job.headless = True
+    # Act
+    with pytest.raises(ValueError):
+        job.show_me_stuff()
+    [(_, error)] = Pipeline(fetch_workers=1).run([job])
+    # Assert
+    reports = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [report["metrics"]["error"] for report in reports] == ["ValueError: unexpected content"] * 2
+    assert isinstance(error, ValueError)
+
+
+def test_serve_mode_runs_are_reported():
+    # Arrange
+    stream = io.StringIO()
+    cache = RenderCache(SampleCryptoVisualize)
+    cache.visualization_object.run_report_sink = StreamSink(stream, "json")
+    # Act
+    cache.refresh()
+    cache.refresh()
+    # Assert
+    first, unchanged = [json.loads(line)["metrics"] for line in stream.getvalue().splitlines()]
+    assert first["rows"] == len(crypto_sample_data)
+    assert set(first["stage_seconds"]) == {"fetch", "process", "visualize"}
+    assert "rows" not in unchanged and set(unchanged["stage_seconds"]) == {"fetch"}
+
+
+def test_report_sinks_have_to_implement_write_text():
+    # Arrange
+    class IncompleteSink(ReportSink):
+        pass
+    # Act
+    with pytest.raises(TypeError):
+        IncompleteSink()
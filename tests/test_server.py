@@ -0,0 +1,137 @@
+import gzip
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from test_sample_data import crypto_sample_data
+from sample_visualizations import SampleCryptoVisualize
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import CryptoVisualize
+from server import RenderCache, make_server
+from http_client import ApiRequestError
+from history import CryptoHistory
+from queries import TickQuery
+
+
+class CountingVisualize(SampleCryptoVisualize):
+    calls = 0
+
+    def api_requests(self, api_url):
+        CountingVisualize.calls += 1
+        return super().api_requests(api_url)
+
+
+def test_serve_rendered_visualization():
+    # Arrange
+    server = make_server([CountingVisualize], 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{server.server_port}/counting"
+
+    def fetch(headers):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as res:
+                return res.status, res.headers, res.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, b""
+
+    # Act
+    with ThreadPoolExecutor(8) as executor:
+        responses = list(executor.map(fetch, [{"Accept-Encoding": "gzip"}] * 8))
+    status, headers, body = responses[0]
+    not_modified_status, _, _ = fetch({"If-None-Match": headers["ETag"]})
+    server.shutdown()
+    # Assert
+    assert CountingVisualize.calls == 1
+    assert status == 200
+    assert headers["Content-Type"] == "text/html"
+    assert gzip.decompress(body).startswith(b"<html>")
+    assert not_modified_status == 304
+
+
+def test_serve_history_queries(tmp_path):
+    # Arrange
+    history = CryptoHistory(str(tmp_path))
+    history.append(CryptoVisualize().process_content(crypto_sample_data))
+    server = make_server([], 0, TickQuery(history))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{server.server_port}/history"
+    # Act
+    with urllib.request.urlopen(f"{url}/price?at=2024-07-02T12:00:00Z") as res:
+        price = json.load(res)
+    with urllib.request.urlopen(f"{url}/ohlc?start=2024-07-01&end=2024-07-03") as res:
+        ohlc = json.load(res)
+    try:
+        urllib.request.urlopen(f"{url}/price?at=2020-01-01")
+    except urllib.error.HTTPError as e:
+        missing_status = e.code
+    server.shutdown()
+    # Assert
+    assert price["price"] == crypto_sample_data[1]["price"]
+    assert ohlc["open"] == crypto_sample_data[0]["price"] and ohlc["close"] == crypto_sample_data[1]["price"]
+    assert missing_status == 404
+
+
+class FlakyVisualize(CryptoVisualize):
+    refresh_interval = 0
+    calls = 0
+
+    def api_requests(self, api_url):
+        FlakyVisualize.calls += 1
+        return [{**tick, "price": tick["price"] + FlakyVisualize.calls} for tick in crypto_sample_data]
+
+    def process_content(self, content):
+        if FlakyVisualize.calls > 1:
+            raise RuntimeError("processing failed")
+        return super().process_content(content)
+
+
+def test_last_page_is_served_when_refresh_fails():
+    # Arrange
+    cache = RenderCache(FlakyVisualize)
+    # Act
+    page = cache.get()
+    stale_page = cache.get()
+    # Assert
+    assert FlakyVisualize.calls == 2
+    assert stale_page is page
+
+
+class OutageVisualize(SampleCryptoVisualize):
+    refresh_interval = 0
+    calls = 0
+
+    def api_requests(self, api_url):
+        OutageVisualize.calls += 1
+        if OutageVisualize.calls > 1:
+            time.sleep(0.1)
+            raise ApiRequestError("upstream is down")
+        return super().api_requests(api_url)
+
+
+def test_failed_refresh_is_not_repeated_by_waiting_viewers():
+    # Arrange
+    cache = RenderCache(OutageVisualize)
+    page = cache.get()
+    # Act
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        pages = list(executor.map(lambda _: cache.get(), range(20)))
+    # Assert
+    assert OutageVisualize.calls == 2
+    assert all(stale_page is page for stale_page in pages)
+
+
+def test_error_is_served_until_retry():
+    # Arrange
+    cache = RenderCache(OutageVisualize)
+    OutageVisualize.calls = 1
+    # Act
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        errors = [future.exception() for future in [executor.submit(cache.get) for _ in range(5)]]
+    # Assert
+    assert OutageVisualize.calls == 2
+    assert all(isinstance(error, ApiRequestError) for error in errors)
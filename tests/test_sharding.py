@@ -0,0 +1,36 @@
+import pandas as pd
+from sample_visualizations import SampleAutobahnVisualize
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from sharding import ShardPool
+
+
+class CountingShardPool(ShardPool):
+    processed_highways = 0
+
+    def process_highways(self, visualization_class, highways):
+        self.processed_highways += len(highways)
+        return super().process_highways(visualization_class, highways)
+
+
+def test_sharded_processing_matches_serial():
+    # Arrange
+    serial_object = SampleAutobahnVisualize()
+    sharded_object = SampleAutobahnVisualize()
+    sharded_object.shard_pool = CountingShardPool(workers=2)
+    content = sharded_object.api_requests(sharded_object.get_api_url())
+    # Act
+    try:
+        expected = serial_object.process(content)
+        data = sharded_object.process(content)
+        sharded_object.track_result(data)
+        # unchanged highways are not processed again
+        sharded_object.track_result(sharded_object.process(content))
+    finally:
+        sharded_object.shard_pool.shutdown()
+    # Assert
+    pd.testing.assert_frame_equal(data, expected)
+    assert sharded_object.shard_pool.processed_highways == len(content)
+    assert sharded_object.changes == {"added": [], "removed": [], "changed": [], "reprocessed_highways": 0}
@@ -0,0 +1,56 @@
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+import pytest
+from sample_visualizations import SampleCryptoVisualize, SampleDogVisualize
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from pipeline import Pipeline
+from shared_results import share
+
+
+def test_data_frame_round_trip():
+    # Arrange
+    data = pd.DataFrame({
+        "price": np.linspace(0, 1, 1000),
+        "spots": np.arange(1000, dtype=np.int16),
+        "time": pd.date_range("2024-01-01", periods=1000, freq="min"),
+        "Autobahn": pd.Categorical(["A1", "A3"] * 500),
+        "subtitle": [f"park {number}" for number in range(1000)],
+    })
+    # Act
+    result = share(data)
+    with result as shared_data:
+        # Assert
+        pd.testing.assert_frame_equal(shared_data, data)
+        assert not shared_data["price"].to_numpy().flags.owndata
+        shared_data = None
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=result.name)
+
+
+def test_bytes_round_trip():
+    # Arrange
+    image = bytes(range(256)) * 100
+    # Act
+    loaded = share(image).load()
+    empty = share(b"").load()
+    # Assert
+    assert loaded == image
+    assert empty == b""
+
+
+def test_pipeline_hands_results_over_in_shared_memory():
+    # Arrange
+    jobs = [SampleCryptoVisualize(), SampleDogVisualize()]
+    for job in jobs:
+        job.headless = True
+    # Act
+    results = Pipeline(fetch_workers=2, shared_memory=True).run(jobs)
+    # Assert
+    assert [error for _, error in results] == [None, None]
+    outputs = {type(job).__name__: job.output for job, _ in results}
+    assert outputs["SampleDogVisualize"] == (SampleDogVisualize.image, ".png")
+    assert outputs["SampleCryptoVisualize"][1] == ".html"
@@ -0,0 +1,31 @@
+import numpy as np
+from test_sample_data import autobahn_sample_data
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path().resolve()) + "/src")
+from model import AutobahnVisualize
+from spatial import TruckParkIndex, haversine_km
+
+
+def brute_force(df, lat, lon, min_lorry_spots):
+    distances = haversine_km(lat, lon, df["coordinate.lat"].astype(float), df["coordinate.long"].astype(float))
+    distances = np.where(df["lorry_spots"] >= min_lorry_spots, distances, np.inf)
+    return np.argsort(distances, kind="stable"), np.sort(distances)
+
+
+def test_nearest_and_within_match_brute_force(tmp_path):
+    # Arrange
+    df = AutobahnVisualize().process_content(autobahn_sample_data)
+    index = TruckParkIndex.from_dataframe(df)
+    index.save(tmp_path / "index.npz")
+    loaded_index = TruckParkIndex.load(tmp_path / "index.npz")
+    expected_positions, expected_distances = brute_force(df, 50.11, 8.68, 20)
+    # Act
+    positions, distances = loaded_index.nearest(50.11, 8.68, k=5, min_lorry_spots=20)
+    radius_positions, radius_distances = index.within(50.11, 8.68, 100, min_lorry_spots=20)
+    # Assert
+    assert list(positions) == list(expected_positions[:5])
+    assert np.allclose(distances, expected_distances[:5])
+    assert len(radius_positions) == (expected_distances <= 100).sum()
+    assert (radius_distances <= 100).all()